@@ -0,0 +1,490 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from geceval.correction_index import LanguageIndex
+from geceval.evaluator import Evaluator, GECModules
+from geceval.file_loaders import write_merged
+from geceval.modules.stand_in_modules import (
+    HashedEmbeddingModule,
+    RuleCountModule,
+    ScriptSwitchModule,
+)
+
+FORMAT_VERSION = 3
+
+# Offline replacements of the modules that download models or start servers
+STAND_INS = {
+    GECModules.BERTSCORE: HashedEmbeddingModule,
+    GECModules.SENTENCE_BERT: HashedEmbeddingModule,
+    GECModules.BLEURT: HashedEmbeddingModule,
+    GECModules.LANGUAGE_SWITCH: ScriptSwitchModule,
+    GECModules.LANGUAGE_TOOL: RuleCountModule,
+}
+
+VOCABULARY = {
+    "en": "the a student teacher house city went saw wrote book letter yesterday "
+    "today because and but very happy friend school train morning evening "
+    "they we she he is was were have has will would visit museum program",
+    "de": "der die das ein eine Schüler Lehrer Haus Stadt ging sah schrieb Buch "
+    "Brief gestern heute weil und aber sehr glücklich Freund Schule Zug "
+    "Morgen Abend sie wir er ist war waren haben hat wird würde Museum",
+    "it": "il la un una studente insegnante casa città andò vide scrisse libro "
+    "lettera ieri oggi perché e ma molto felice amico scuola treno mattina "
+    "sera loro noi lei lui è era erano hanno ha sarà visitare museo",
+    "sv": "en ett studenten läraren huset staden gick såg skrev bok brev igår "
+    "idag eftersom och men mycket glad vän skola tåg morgon kväll de vi "
+    "hon han är var har hade kommer skulle besöka museet",
+    "cs": "student učitel dům město šel viděl napsal kniha dopis včera dnes "
+    "protože a ale velmi šťastný přítel škola vlak ráno večer oni my ona "
+    "on je byl byli mají má bude navštívit muzeum",
+}
+DEFAULT_MODEL_NAMES = ["aya", "gemma", "karen", "llama31", "mistral", "phi", "qwen"]
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 3:
+        return word + word[-1]
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def _sentence(words: List[str], rng: random.Random) -> str:
+    tokens = [rng.choice(words) for _ in range(rng.randint(5, 25))]
+    if rng.random() < 0.3:
+        tokens.insert(rng.randrange(1, len(tokens)), ",")
+    text = " ".join(tokens).replace(" ,", ",")
+    return text[0].upper() + text[1:] + rng.choice(".!?")
+
+
+def generate_dataset(
+    num_entries: int = 200,
+    languages: Sequence[str] = ("en", "de"),
+    prompt_ids: Sequence[int] = (1, 2),
+    model_names: Sequence[str] = DEFAULT_MODEL_NAMES,
+    seed: int = 0,
+) -> Dict:
+    """
+    Deterministic synthetic dataset in the merged multi-LLM schema. Incorrect
+    entries carry typos that some corrections fix, the others are kept or
+    rephrased, a few corrections are missing
+    """
+    rng = random.Random(seed)
+    data = {}
+    for language in languages:
+        words = VOCABULARY[language].split()
+        lang_data = {}
+        for idx in range(num_entries):
+            correct = _sentence(words, rng)
+            is_correct = rng.random() < 0.3
+            text = correct
+            if not is_correct:
+                tokens = correct.split(" ")
+                for _ in range(rng.randint(1, 3)):
+                    i = rng.randrange(len(tokens))
+                    tokens[i] = _typo(tokens[i], rng)
+                text = " ".join(tokens)
+
+            corrections = []
+            for prompt_id in prompt_ids:
+                for model_name in model_names:
+                    draw = rng.random()
+                    if draw < 0.02:
+                        continue
+                    if draw < 0.4:
+                        content = text
+                    elif draw < 0.8:
+                        content = correct
+                    else:
+                        content = _sentence(words, rng)
+                    corrections.append(
+                        {
+                            "prompt_id": prompt_id,
+                            "content": content,
+                            "model_name": model_name,
+                        }
+                    )
+            lang_data[f"{language}_{idx:06d}.txt"] = {
+                "marked_correct": "correct" if is_correct else "incorrect",
+                "text": text,
+                "corrections": corrections,
+            }
+        data[language] = lang_data
+    return data
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss / scale
+
+
+def _latency_stats(latencies: List[float], unit: str) -> Dict:
+    """Percentiles of the latencies of whole batches or of single pairs"""
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        f"{unit}_p{q}_ms": float(np.percentile(latencies_ms, q)) for q in (50, 90, 99)
+    }
+
+
+def _make_evaluator(use_stand_ins: bool, modules: Sequence[GECModules]) -> Evaluator:
+    # The regex tokenizer needs no punkt download, keeping stand-in runs offline
+    return Evaluator(
+        module_options=_module_options(use_stand_ins, modules),
+        construction_map=STAND_INS if use_stand_ins else None,
+        tokenizer="regex" if use_stand_ins else "nltk",
+        modules=modules,
+    )
+
+
+def _module_options(use_stand_ins: bool, modules: Sequence[GECModules]) -> Dict:
+    if not use_stand_ins:
+        return {}
+    return {
+        module: {"name": f"{module.name} stand-in"}
+        for module in modules
+        if module in STAND_INS
+    }
+
+
+def _aligned_pairs(language_index: LanguageIndex):
+    texts, references = [], []
+    for key in sorted(language_index.slices):
+        correction_slice = language_index.slices[key]
+        texts.extend(language_index.get_aligned_originals(correction_slice))
+        references.extend(correction_slice.texts)
+    return texts, references
+
+
+def _score(gec_module, texts: List[str], references: List[str]):
+    if gec_module.supports_references:
+        gec_module.score_pairs(texts, references)
+    else:
+        gec_module.score_texts(references)
+
+
+def _run_module(
+    language_index: LanguageIndex,
+    module: GECModules,
+    batch_size: int,
+    use_stand_ins: bool,
+) -> Dict:
+    """Benchmark one module at one batch size, in a fresh process"""
+    evaluator = _make_evaluator(use_stand_ins, [module])
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gec_module = evaluator.get_evaluator(language_index.language, module)
+    load_seconds = time.perf_counter() - start
+
+    texts, references = _aligned_pairs(language_index)
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        batch_start = time.perf_counter()
+        _score(
+            gec_module,
+            texts[offset : offset + batch_size],
+            references[offset : offset + batch_size],
+        )
+        latencies.append(time.perf_counter() - batch_start)
+    seconds = time.perf_counter() - start
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator.close()
+
+    return {
+        "language": language_index.language,
+        "module": module.name,
+        "batch_size": batch_size,
+        "items": len(texts),
+        "load_seconds": load_seconds,
+        "seconds": seconds,
+        "sentences_per_sec": len(texts) / seconds if seconds else 0.0,
+        **_latency_stats(latencies, "batch"),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_pair_latency(
+    language_index: LanguageIndex,
+    module: GECModules,
+    num_items: int,
+    use_stand_ins: bool,
+) -> Dict:
+    """
+    Latency of one module scoring single pairs, unbatched, in a fresh process.
+    Only distinct pairs are timed, so that no pair is a repeat of a cached one
+    """
+    evaluator = _make_evaluator(use_stand_ins, [module])
+    with contextlib.redirect_stdout(io.StringIO()):
+        gec_module = evaluator.get_evaluator(language_index.language, module)
+
+    pairs = list(dict.fromkeys(zip(*_aligned_pairs(language_index))))[:num_items]
+    latencies = []
+    for text, reference in pairs:
+        start = time.perf_counter()
+        _score(gec_module, [text], [reference])
+        latencies.append(time.perf_counter() - start)
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator.close()
+
+    return {
+        "language": language_index.language,
+        "module": module.name,
+        "items": len(pairs),
+        **_latency_stats(latencies, "pair"),
+    }
+
+
+def _run_evaluator(
+    dataset_path: str,
+    languages: List[str],
+    modules: List[GECModules],
+    num_workers: int,
+    use_stand_ins: bool,
+) -> Dict:
+    """Benchmark Evaluator.evaluate end to end, in a fresh process"""
+    logging.disable(logging.INFO)
+    evaluator = _make_evaluator(use_stand_ins, modules)
+    items = 0
+    for language_index in evaluator.iter_language_indexes(dataset_path, languages):
+        units = evaluator.plan_units([language_index.language], True)
+        items += len(units) * sum(
+            len(s.texts) for s in language_index.slices.values()
+        )
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator.evaluate(
+            dataset_path,
+            use_comparative_metrics=True,
+            languages=languages,
+            num_workers=num_workers,
+        )
+        evaluator.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        "workers": num_workers,
+        "items": items,
+        "seconds": seconds,
+        "sentences_per_sec": items / seconds if seconds else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_worker_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _in_fresh_process(function, *args):
+    # One process per measurement keeps model loads and peak RSS separate
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(function, *args).result()
+
+
+def run_benchmark(
+    output_path: str,
+    modules: Optional[List[GECModules]] = None,
+    languages: Sequence[str] = ("en", "de"),
+    num_entries: int = 200,
+    batch_sizes: Sequence[int] = (1, 32, 256),
+    worker_counts: Sequence[int] = (1, 2),
+    latency_items: int = 200,
+    use_stand_ins: bool = True,
+    seed: int = 0,
+) -> Dict:
+    """
+    Run the module, per-pair latency and end-to-end benchmarks and save the
+    results as JSON. latency_items pairs per module are scored one by one,
+    0 skips the latency pass
+    """
+    modules = modules or list(GECModules)
+    languages = list(languages)
+    results = {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+            "num_entries": num_entries,
+            "seed": seed,
+            "stand_ins": use_stand_ins,
+        },
+        "modules": [],
+        "latency": [],
+        "evaluator": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset_path = str(Path(tmp_dir) / "synthetic.json.xz")
+        data = generate_dataset(num_entries, languages, seed=seed)
+        write_merged(data, dataset_path)
+        supported = Evaluator().per_language_modules
+
+        for language in languages:
+            language_index = LanguageIndex.from_data(language, data[language])
+            for module in modules:
+                if module not in supported[language]:
+                    continue
+                for batch_size in batch_sizes:
+                    result = _in_fresh_process(
+                        _run_module, language_index, module, batch_size, use_stand_ins
+                    )
+                    print(
+                        f"{language}\t{module.name}\tbatch: {batch_size}"
+                        f"\t{result['sentences_per_sec']:.1f} sentences/s"
+                        f"\tbatch p50: {result['batch_p50_ms']:.3f} ms"
+                        f"\tload: {result['load_seconds']:.2f} s"
+                        f"\tpeak RSS: {result['peak_rss_mb']:.0f} MB"
+                    )
+                    results["modules"].append(result)
+                if latency_items:
+                    result = _in_fresh_process(
+                        _run_pair_latency,
+                        language_index,
+                        module,
+                        latency_items,
+                        use_stand_ins,
+                    )
+                    print(
+                        f"{language}\t{module.name}\tsingle pairs"
+                        f"\tpair p50: {result['pair_p50_ms']:.3f} ms"
+                        f"\tp90: {result['pair_p90_ms']:.3f} ms"
+                        f"\tp99: {result['pair_p99_ms']:.3f} ms"
+                    )
+                    results["latency"].append(result)
+
+        for num_workers in worker_counts:
+            result = _in_fresh_process(
+                _run_evaluator,
+                dataset_path,
+                languages,
+                modules,
+                num_workers,
+                use_stand_ins,
+            )
+            print(
+                f"Evaluator\tworkers: {num_workers}"
+                f"\t{result['sentences_per_sec']:.1f} sentences/s"
+                f"\t{result['seconds']:.2f} s"
+            )
+            results["evaluator"].append(result)
+
+    with open(output_path, "w") as out:
+        json.dump(results, out, indent=4)
+    return results
+
+
+def _result_keys(results: Dict) -> Dict:
+    keys = {}
+    for result in results["modules"]:
+        key = f"{result['language']}\t{result['module']}\tbatch: {result['batch_size']}"
+        keys[key] = result["sentences_per_sec"]
+    for result in results["evaluator"]:
+        keys[f"Evaluator\tworkers: {result['workers']}"] = result["sentences_per_sec"]
+    return keys
+
+
+def compare_results(previous: Dict, current: Dict, tolerance: float = 0.1) -> List:
+    """
+    Print the throughput change of every benchmark present in both runs and
+    return the ones that slowed down by more than the tolerance
+    """
+    previous_keys = _result_keys(previous)
+    regressions = []
+    for key, throughput in _result_keys(current).items():
+        if key not in previous_keys or not previous_keys[key]:
+            continue
+        ratio = throughput / previous_keys[key]
+        flag = ""
+        if ratio < 1.0 - tolerance:
+            regressions.append((key, ratio))
+            flag = "\tREGRESSION"
+        print(
+            f"{key}\t{previous_keys[key]:.1f} -> {throughput:.1f} ({ratio:.2f}x){flag}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Throughput benchmark of the GEC modules and the evaluator "
+        "on a synthetic dataset"
+    )
+    parser.add_argument("output_path", help="JSON file to write the results to")
+    parser.add_argument(
+        "--modules",
+        help="GECModules names, comma-separated, all by default",
+        default=None,
+    )
+    parser.add_argument(
+        "-l", "--languages", help="Languages, comma-separated", default="en,de"
+    )
+    parser.add_argument(
+        "-n", "--entries", help="Entries per language", type=int, default=200
+    )
+    parser.add_argument(
+        "--batch_sizes", help="Batch sizes, comma-separated", default="1,32,256"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Evaluator worker counts, comma-separated",
+        default="1,2",
+    )
+    parser.add_argument(
+        "--latency_items",
+        help="Pairs per module scored one by one for the per-pair latency, "
+        "0 to skip",
+        type=int,
+        default=200,
+    )
+    parser.add_argument(
+        "--real_models",
+        help="Use the real models instead of the offline stand-ins",
+        action="store_true",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compare", help="Previous results JSON to compare against", default=None
+    )
+    parser.add_argument(
+        "--tolerance",
+        help="Relative throughput drop reported as a regression",
+        type=float,
+        default=0.1,
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.output_path,
+        modules=[GECModules[name] for name in args.modules.split(",")]
+        if args.modules
+        else None,
+        languages=args.languages.split(","),
+        num_entries=args.entries,
+        batch_sizes=[int(b) for b in args.batch_sizes.split(",")],
+        worker_counts=[int(w) for w in args.workers.split(",")],
+        latency_items=args.latency_items,
+        use_stand_ins=not args.real_models,
+        seed=args.seed,
+    )
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare_results(previous, results, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,226 @@
+import argparse
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from geceval.correction_index import LanguageIndex
+
+FORMAT_VERSION = 1
+STRING_COLUMNS = ("entry_ids", "texts", "contents")
+
+
+class StringColumnWriter:
+    """Accumulates UTF-8 strings as one byte buffer plus an offsets array"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, value: str):
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def save(self, path: Path, name: str):
+        np.save(path / f"{name}.offsets.npy", np.frombuffer(self.offsets, np.int64))
+        np.save(path / f"{name}.data.npy", np.frombuffer(self.data, np.uint8))
+
+
+class StringColumn:
+    """Memory-mapped string column, strings are decoded only when accessed"""
+
+    def __init__(self, path: Path, name: str):
+        self.offsets = np.load(path / f"{name}.offsets.npy", mmap_mode="r")
+        self.data = np.load(path / f"{name}.data.npy", mmap_mode="r")
+
+    def __getitem__(self, idx: int) -> str:
+        return bytes(self.data[self.offsets[idx] : self.offsets[idx + 1]]).decode(
+            "utf-8"
+        )
+
+    def take(self, indices: Iterable[int]) -> List[str]:
+        return [self[idx] for idx in indices]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def write_columnar(entries: Iterable[Tuple[str, str, Dict]], path: str):
+    """
+    Write (language, entry_id, entry) triples as a directory of .npy columns:
+    dictionary-encoded languages, prompt ids, model names and labels, and
+    offset-encoded strings
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    dictionaries = {"languages": {}, "prompt_ids": {}, "model_names": {}, "labels": {}}
+
+    def encode(dictionary, value):
+        return dictionaries[dictionary].setdefault(value, len(dictionaries[dictionary]))
+
+    strings = {name: StringColumnWriter() for name in STRING_COLUMNS}
+    entry_language = array("h")
+    entry_label = array("h")
+    correction_entry = array("q")
+    correction_language = array("h")
+    correction_prompt = array("h")
+    correction_model = array("h")
+
+    for language, entry_id, entry in entries:
+        entry_idx = len(entry_language)
+        language_code = encode("languages", language)
+        entry_language.append(language_code)
+        entry_label.append(encode("labels", entry["marked_correct"]))
+        strings["entry_ids"].append(entry_id)
+        strings["texts"].append(entry["text"])
+
+        for correction in entry["corrections"]:
+            correction_entry.append(entry_idx)
+            correction_language.append(language_code)
+            correction_prompt.append(encode("prompt_ids", correction["prompt_id"]))
+            correction_model.append(encode("model_names", correction["model_name"]))
+            strings["contents"].append(correction["content"])
+
+    for name, column in strings.items():
+        column.save(path, name)
+    for name, column, dtype in [
+        ("entry_language", entry_language, np.int16),
+        ("entry_label", entry_label, np.int16),
+        ("correction_entry", correction_entry, np.int64),
+        ("correction_language", correction_language, np.int16),
+        ("correction_prompt", correction_prompt, np.int16),
+        ("correction_model", correction_model, np.int16),
+    ]:
+        np.save(path / f"{name}.npy", np.frombuffer(column, dtype))
+
+    meta = {"version": FORMAT_VERSION}
+    meta.update({name: list(values) for name, values in dictionaries.items()})
+    with open(path / "meta.json", "w") as out:
+        json.dump(meta, out, ensure_ascii=False)
+
+
+def is_columnar(path: str) -> bool:
+    return (Path(path) / "meta.json").is_file()
+
+
+class ColumnarDataset:
+    """Read-only, memory-mapped view of a columnar merged dataset"""
+
+    def __init__(self, path: str):
+        path = Path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {meta['version']}")
+
+        self.languages = meta["languages"]
+        self.prompt_ids = meta["prompt_ids"]
+        self.model_names = meta["model_names"]
+        self.labels = meta["labels"]
+
+        self.strings = {name: StringColumn(path, name) for name in STRING_COLUMNS}
+        for name in [
+            "entry_language",
+            "entry_label",
+            "correction_entry",
+            "correction_language",
+            "correction_prompt",
+            "correction_model",
+        ]:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+
+    def _codes(self, dictionary: List, values) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        return np.array([dictionary.index(v) for v in values if v in dictionary])
+
+    def language_index(
+        self, language: str, prompt_ids=None, model_names=None
+    ) -> LanguageIndex:
+        """
+        Build the index of one language, decoding only the corrections of the
+        selected prompts and models
+        """
+        language_index = LanguageIndex(language)
+        if language not in self.languages:
+            language_index.finalize()
+            return language_index
+        language_code = self.languages.index(language)
+
+        entries = np.flatnonzero(self.entry_language == language_code)
+        language_index.entry_ids = self.strings["entry_ids"].take(entries)
+        language_index.original_texts = self.strings["texts"].take(entries)
+        language_index.marked_correct = [
+            self.labels[code] for code in self.entry_label[entries]
+        ]
+        entry_positions = np.full(len(self.entry_language), -1, dtype=np.int64)
+        entry_positions[entries] = np.arange(len(entries))
+
+        mask = self.correction_language == language_code
+        prompt_codes = self._codes(self.prompt_ids, prompt_ids)
+        if prompt_codes is not None:
+            mask &= np.isin(self.correction_prompt, prompt_codes)
+        model_codes = self._codes(self.model_names, model_names)
+        if model_codes is not None:
+            mask &= np.isin(self.correction_model, model_codes)
+        corrections = np.flatnonzero(mask)
+
+        keys = (
+            self.correction_prompt[corrections].astype(np.int64) * len(self.model_names)
+            + self.correction_model[corrections]
+        )
+        for key in np.unique(keys):
+            selected = corrections[keys == key]
+            prompt_code, model_code = divmod(int(key), len(self.model_names))
+            language_index.add_corrections(
+                self.prompt_ids[prompt_code],
+                self.model_names[model_code],
+                entry_positions[self.correction_entry[selected]],
+                self.strings["contents"].take(selected),
+            )
+        language_index.finalize()
+        return language_index
+
+    def iter_languages(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (language, {entry_id: entry}) in the nested merged format"""
+        for language_code, language in enumerate(self.languages):
+            entries = np.flatnonzero(self.entry_language == language_code)
+            entry_ids = self.strings["entry_ids"].take(entries)
+            entry_id_of = dict(zip(entries.tolist(), entry_ids))
+
+            lang_data = {}
+            for entry_id, text, label_code in zip(
+                entry_ids, self.strings["texts"].take(entries), self.entry_label[entries]
+            ):
+                lang_data[entry_id] = {
+                    "marked_correct": self.labels[label_code],
+                    "text": text,
+                    "corrections": [],
+                }
+
+            for idx in np.flatnonzero(self.correction_language == language_code):
+                entry_id = entry_id_of[int(self.correction_entry[idx])]
+                lang_data[entry_id]["corrections"].append(
+                    {
+                        "prompt_id": self.prompt_ids[self.correction_prompt[idx]],
+                        "content": self.strings["contents"][idx],
+                        "model_name": self.model_names[self.correction_model[idx]],
+                    }
+                )
+            yield language, lang_data
+
+
+if __name__ == "__main__":
+    from geceval.file_loaders import iter_merged_entries
+
+    parser = argparse.ArgumentParser(
+        description="Convert a merged multi-LLM dataset to the columnar format"
+    )
+    parser.add_argument("input_path", help="Merged dataset (.json[.xz] or .jsonl[.xz])")
+    parser.add_argument("output_path", help="Output directory")
+    args = parser.parse_args()
+
+    write_columnar(iter_merged_entries(args.input_path), args.output_path)
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+
+class CorrectionSlice:
+    """Corrections of one (language, prompt_id, model_name) key, aligned with
+    the positions of the entries they correct"""
+
+    def __init__(self):
+        self.positions = []
+        self.texts = []
+        self.has_correction = np.zeros(0, dtype=bool)
+
+    def finalize(self, num_entries: int):
+        self.positions = np.asarray(self.positions, dtype=np.int64)
+        self.has_correction = np.zeros(num_entries, dtype=bool)
+        self.has_correction[self.positions] = True
+
+    def __len__(self):
+        return len(self.texts)
+
+
+class LanguageIndex:
+    """Originals of one language and their corrections grouped by
+    (prompt_id, model_name)"""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.entry_ids = []
+        self.original_texts = []
+        self.marked_correct = []
+        self.slices = defaultdict(CorrectionSlice)
+        self.prompt_ids = set()
+        self.model_names = set()
+
+    @classmethod
+    def from_data(cls, language: str, lang_data: Dict) -> "LanguageIndex":
+        language_index = cls(language)
+        for entry_id, entry in lang_data.items():
+            language_index.add_entry(entry_id, entry)
+        language_index.finalize()
+        return language_index
+
+    def add_entry(self, entry_id: str, entry: Dict):
+        position = len(self.entry_ids)
+        self.entry_ids.append(entry_id)
+        self.original_texts.append(entry["text"])
+        self.marked_correct.append(entry["marked_correct"])
+
+        for correction in entry["corrections"]:
+            correction_slice = self.slices[
+                (correction["prompt_id"], correction["model_name"])
+            ]
+            correction_slice.positions.append(position)
+            correction_slice.texts.append(correction["content"])
+            self.prompt_ids.add(correction["prompt_id"])
+            self.model_names.add(correction["model_name"])
+
+    def add_corrections(self, prompt_id, model_name, positions, texts: List[str]):
+        """Append a block of corrections of one (prompt_id, model_name)"""
+        correction_slice = self.slices[(prompt_id, model_name)]
+        correction_slice.positions.extend(positions)
+        correction_slice.texts.extend(texts)
+        self.prompt_ids.add(prompt_id)
+        self.model_names.add(model_name)
+
+    def finalize(self):
+        self.slices = dict(self.slices)
+        for correction_slice in self.slices.values():
+            correction_slice.finalize(len(self.entry_ids))
+
+    def subset(self, positions) -> "LanguageIndex":
+        """
+        Index of the entries at the given ascending positions, with all their
+        corrections. global_positions maps its positions back to this index.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        local_positions = np.full(len(self.entry_ids), -1, dtype=np.int64)
+        local_positions[positions] = np.arange(len(positions))
+
+        subset = LanguageIndex(self.language)
+        for position in positions.tolist():
+            subset.entry_ids.append(self.entry_ids[position])
+            subset.original_texts.append(self.original_texts[position])
+            subset.marked_correct.append(self.marked_correct[position])
+        for (prompt_id, model_name), correction_slice in self.slices.items():
+            kept = np.flatnonzero(local_positions[correction_slice.positions] >= 0)
+            subset.add_corrections(
+                prompt_id,
+                model_name,
+                local_positions[correction_slice.positions[kept]].tolist(),
+                [correction_slice.texts[i] for i in kept],
+            )
+        subset.finalize()
+        subset.global_positions = positions
+        return subset
+
+    def get_slice(self, prompt_id, model_name) -> CorrectionSlice:
+        correction_slice = self.slices.get((prompt_id, model_name))
+        if correction_slice is None:
+            correction_slice = CorrectionSlice()
+            correction_slice.finalize(len(self.entry_ids))
+        return correction_slice
+
+    def get_aligned_originals(self, correction_slice: CorrectionSlice) -> List[str]:
+        """Originals aligned one-to-one with the corrections of a slice"""
+        return [self.original_texts[p] for p in correction_slice.positions]
+
+    def get_missing_entry_ids(self, prompt_id, model_name) -> List[str]:
+        correction_slice = self.get_slice(prompt_id, model_name)
+        return [
+            self.entry_ids[p] for p in np.flatnonzero(~correction_slice.has_correction)
+        ]
+
+    def __len__(self):
+        return len(self.entry_ids)
+
+
+class CorrectionIndex:
+    """One-pass index of a merged multi-LLM dataset keyed by
+    (language, prompt_id, model_name)"""
+
+    def __init__(self):
+        self.languages = {}
+        self.prompt_ids = set()
+        self.model_names = set()
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "CorrectionIndex":
+        index = cls()
+        for language, lang_data in data.items():
+            index.add_language(LanguageIndex.from_data(language, lang_data))
+        return index
+
+    def add_language(self, language_index: LanguageIndex):
+        self.languages[language_index.language] = language_index
+        self.prompt_ids |= language_index.prompt_ids
+        self.model_names |= language_index.model_names
+
+    def get_slice(self, language: str, prompt_id, model_name) -> CorrectionSlice:
+        return self.languages[language].get_slice(prompt_id, model_name)
+
+    def __getitem__(self, language: str) -> LanguageIndex:
+        return self.languages[language]
+
+    def __contains__(self, language: str):
+        return language in self.languages
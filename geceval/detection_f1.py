@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from geceval.correction_index import LanguageIndex
+from geceval.modules.lexical_engine import get_lexical_engine
+
+# Model whose corrections define the always_zero / always_one baselines
+BASELINE_MODEL = "karen"
+
+# Outcome codes of a correction: an entry marked correct that was left
+# unchanged is a true positive, changed a false positive; an incorrect entry
+# left unchanged is a false negative
+TP, FP, FN, OTHER = 0, 1, 2, 3
+
+
+@dataclass
+class Measure:
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+
+    @property
+    def precision(self) -> float:
+        if self.tp + self.fp == 0:
+            return 0.0
+        return self.tp / (self.tp + self.fp)
+
+    @property
+    def recall(self) -> float:
+        if self.tp + self.fn == 0:
+            return 0.0
+        return self.tp / (self.tp + self.fn)
+
+    @property
+    def f1(self) -> float:
+        if self.precision + self.recall == 0:
+            return 0.0
+        return 2.0 * self.precision * self.recall / (self.precision + self.recall)
+
+
+@dataclass
+class DetectionReport:
+    language: str
+    total: int = 0
+    correct: int = 0
+    per_model: Dict[str, Measure] = field(default_factory=dict)
+    per_prompt: Dict = field(default_factory=dict)
+    lengths: List[int] = field(default_factory=list)
+    token_lengths: List[int] = field(default_factory=list)
+
+
+def _measure(counts: np.ndarray) -> Measure:
+    return Measure(int(counts[TP]), int(counts[FP]), int(counts[FN]))
+
+
+def detection_f1(
+    language_index: LanguageIndex,
+    prompt_ids,
+    model_names,
+    baseline_model: str = BASELINE_MODEL,
+    tokenizer: str = "nltk",
+) -> DetectionReport:
+    """
+    Change-detection precision/recall/F1 per model and per prompt: does a model
+    leave the entries marked correct unchanged and change the others. The
+    confusion counts of all (prompt_id, model_name) slices are computed with
+    one bincount over integer-coded outcomes.
+    """
+    report = DetectionReport(language_index.language)
+    was_correct = np.array(
+        [label == "correct" for label in language_index.marked_correct], dtype=bool
+    )
+    report.total = len(language_index)
+    report.correct = int(was_correct.sum())
+
+    engine = get_lexical_engine(language_index.language, tokenizer)
+    originals = [text.strip().lower() for text in language_index.original_texts]
+    report.lengths = [len(text) for text in originals]
+    report.token_lengths = [len(engine.get_tokens(text)) for text in originals]
+
+    prompt_ids = list(prompt_ids)
+    model_names = list(model_names)
+    slice_models = model_names + [m for m in [baseline_model] if m not in model_names]
+    keys = [(p, m) for p in prompt_ids for m in slice_models]
+
+    key_codes = [np.zeros(0, dtype=np.int64)]
+    positions = [np.zeros(0, dtype=np.int64)]
+    changed = []
+    for key_code, key in enumerate(keys):
+        correction_slice = language_index.get_slice(*key)
+        key_codes.append(np.full(len(correction_slice), key_code, dtype=np.int64))
+        positions.append(correction_slice.positions)
+        changed.extend(
+            originals[position] != text.strip().lower()
+            for position, text in zip(
+                correction_slice.positions.tolist(), correction_slice.texts
+            )
+        )
+    key_codes = np.concatenate(key_codes)
+    positions = np.concatenate(positions).astype(np.int64)
+    changed = np.array(changed, dtype=bool)
+    correct = was_correct[positions]
+
+    outcomes = np.full(len(positions), OTHER, dtype=np.int64)
+    outcomes[correct & ~changed] = TP
+    outcomes[correct & changed] = FP
+    outcomes[~correct & ~changed] = FN
+    per_key = np.bincount(key_codes * 4 + outcomes, minlength=len(keys) * 4)
+    per_key = per_key.reshape(len(keys), 4)
+
+    key_prompts = np.array([prompt_ids.index(p) for p, _ in keys])
+    key_models = np.array([slice_models.index(m) for _, m in keys])
+    evaluated = key_models < len(model_names)
+    for model_code, model_name in enumerate(model_names):
+        report.per_model[model_name] = _measure(
+            per_key[key_models == model_code].sum(axis=0)
+        )
+    for prompt_code, prompt_id in enumerate(prompt_ids):
+        report.per_prompt[prompt_id] = _measure(
+            per_key[evaluated & (key_prompts == prompt_code)].sum(axis=0)
+        )
+
+    baseline = key_models[key_codes] == slice_models.index(baseline_model)
+    baseline_correct = int(correct[baseline].sum())
+    baseline_incorrect = int(baseline.sum()) - baseline_correct
+    report.per_model["always_zero"] = Measure(
+        tp=baseline_incorrect, fn=baseline_correct
+    )
+    report.per_model["always_one"] = Measure(
+        tp=baseline_correct, fp=baseline_incorrect
+    )
+    return report
+
+
+def format_detection_report(report: DetectionReport) -> List[str]:
+    lines = [
+        f"Detection Language: {report.language}\t total: {report.total}\t correct: {report.correct}",
+        f"Detection Language: {report.language}\t length: {np.mean(report.lengths)} +- {np.std(report.lengths)}",
+        f"Detection Language: {report.language}\t tokens: {np.mean(report.token_lengths)} +- {np.std(report.token_lengths)}",
+    ]
+    for model, measure in sorted(
+        report.per_model.items(), key=lambda item: item[1].f1, reverse=True
+    ):
+        lines.append(
+            f"Detection Language: {report.language}\t Model: {model},\t\tp: {measure.precision},\tr: {measure.recall},\tf1: {measure.f1}"
+        )
+    for prompt, measure in sorted(
+        report.per_prompt.items(), key=lambda item: item[1].f1, reverse=True
+    ):
+        lines.append(
+            f"Detection Language: {report.language}\t Prompt: {prompt},\t\tp: {measure.precision},\tr: {measure.recall},\tf1: {measure.f1}"
+        )
+    return lines
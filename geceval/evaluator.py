@@ -1,15 +1,24 @@
 import argparse
-import json
+import contextlib
 import logging
-import lzma
-from collections import defaultdict
+import multiprocessing
+import multiprocessing.util
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
+import torch
 
+from geceval.columnar_store import ColumnarDataset, is_columnar
+from geceval.correction_index import CorrectionIndex, LanguageIndex
+from geceval.detection_f1 import BASELINE_MODEL, detection_f1, format_detection_report
+from geceval.file_loaders import iter_merged_languages
 from geceval.modules.bertscore_module import BERTScoreModule
 from geceval.modules.bleurt_module import BleuRTModule
+from geceval.modules.gec_module import GECModule, corpus_ratio
 from geceval.modules.gleu import GleuModule
 from geceval.modules.jaccard_distance import JaccardDistanceModule
 from geceval.modules.language_switch_module import LanguageSwitchModule
@@ -19,6 +28,12 @@ from geceval.modules.punctuation_seeker import PunctuationSeekerModule
 from geceval.modules.sentence_bert_module import SentenceBertModule
 from geceval.modules.spell_checker_module import SpellcheckerModule
 from geceval.modules.token_count_distance import TokenCountDistanceModule
+from geceval.profiling import profiler, span
+from geceval.score_cache import ScoreCache
+from geceval.score_store import ScoreStoreWriter
+from geceval.sharding import SHARD_BY, Shard
+from geceval.significance import format_significance_report, model_significance
+from geceval.work_plan import WorkPlan
 
 logging.basicConfig(
     filename="log.output.txt",
@@ -44,13 +59,122 @@ class GECModules(Enum):
     GLEU = 11
 
 
+CONSTRUCTION_MAP = {
+    GECModules.SPELLCHECKING: SpellcheckerModule,
+    GECModules.LANGUAGE_TOOL: LanguageToolModule,
+    GECModules.PUNCTUATION_SEEKER: PunctuationSeekerModule,
+    GECModules.LANGUAGE_SWITCH: LanguageSwitchModule,
+    GECModules.LEVENSHTEIN: LevenshteinModule,
+    GECModules.TOKEN_COUNT_DISTANCE: TokenCountDistanceModule,
+    GECModules.JACCARD: JaccardDistanceModule,
+    GECModules.BERTSCORE: BERTScoreModule,
+    GECModules.SENTENCE_BERT: SentenceBertModule,
+    GECModules.BLEURT: BleuRTModule,
+    GECModules.GLEU: GleuModule,
+}
+
+# Modules tokenizing with the shared lexical engine
+LEXICAL_MODULES = (
+    GECModules.JACCARD,
+    GECModules.TOKEN_COUNT_DISTANCE,
+    GECModules.GLEU,
+)
+
+# Languages whose units may be in the worker pool at once; each keeps its
+# index in memory until its results are reported
+LANGUAGES_IN_FLIGHT = 2
+
+
 def log_screen_file(text):
     print(text)
     logger.log(logging.INFO, text)
 
 
+@dataclass
+class ModuleResult:
+    """Per-sentence scores of one (language, module) work unit"""
+
+    language: str
+    module: GECModules
+    module_name: str
+    original_avg_score: float = 0.0
+    # Corpus-level score over all slices and its additive statistics, if the
+    # module defines one
+    corpus_score: Optional[float] = None
+    corpus_statistics: Optional[Tuple[float, float]] = None
+    original_scores: List[float] = field(default_factory=list)
+    corrected_scores: Dict[Tuple, List[float]] = field(default_factory=dict)
+    # Profiler events recorded by a pool worker, merged by the parent
+    trace_events: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class LanguageRun:
+    """Units of one language in progress, reported once their results are in"""
+
+    language_index: LanguageIndex
+    # The whole language when language_index is the subset of an entry shard
+    full_index: LanguageIndex
+    prompt_ids: List
+    model_names: List
+    log_missing: bool
+    results: Iterator[ModuleResult]
+
+
+_worker_evaluator = None
+
+
+def _init_worker(
+    threads_per_worker: int,
+    module_options: Dict,
+    score_cache_path,
+    construction_map,
+    tokenizer: str,
+    profile: bool,
+):
+    global _worker_evaluator
+    torch.set_num_threads(threads_per_worker)
+    if profile:
+        profiler.enable()
+    _worker_evaluator = Evaluator(
+        module_options, score_cache_path, construction_map, tokenizer
+    )
+    # Pool workers skip atexit, multiprocessing finalizers still run on exit
+    multiprocessing.util.Finalize(
+        _worker_evaluator, _worker_evaluator.close, exitpriority=10
+    )
+
+
+def _evaluate_unit(language_index, module, prompt_ids, model_names, comparative):
+    result = _worker_evaluator.evaluate_module(
+        language_index, module, prompt_ids, model_names, comparative
+    )
+    result.trace_events = profiler.drain()
+    return result
+
+
 class Evaluator:
-    def __init__(self):
+    def __init__(
+        self,
+        module_options: Optional[Dict[GECModules, Dict]] = None,
+        score_cache_path: Optional[str] = None,
+        construction_map: Optional[Dict[GECModules, type]] = None,
+        tokenizer: str = "nltk",
+        modules: Optional[Iterable[GECModules]] = None,
+    ):
+        # Extra constructor keyword arguments per module, e.g. server counts
+        self.module_options = {
+            module: dict(options) for module, options in (module_options or {}).items()
+        }
+        # One tokenization for all lexical modules and the detection report
+        self.tokenizer = tokenizer
+        for module in LEXICAL_MODULES:
+            options = self.module_options.setdefault(module, {})
+            options.setdefault("tokenizer", tokenizer)
+        # Module classes replacing the default ones, e.g. benchmark stand-ins
+        self.construction_map = {**CONSTRUCTION_MAP, **(construction_map or {})}
+        self.score_cache_path = score_cache_path
+        self.score_cache = ScoreCache(score_cache_path) if score_cache_path else None
         self.supported_languages = ["en", "cs", "sv", "de", "it"]
 
         used_modules = {
@@ -67,12 +191,16 @@ class Evaluator:
             GECModules.GLEU
         }
 
+        # Only the given modules are evaluated, e.g. by the benchmark
+        if modules is not None:
+            used_modules &= set(modules)
+
         self.per_language_modules = {
             lang: used_modules for lang in self.supported_languages
         }
 
         self._remove_unsupported_tools()
-        self.evaluators = self._construct_evaluators()
+        self.evaluators = {}
 
     def _remove_unsupported_tools(self):
         if "cs" in self.supported_languages:
@@ -85,73 +213,20 @@ class Evaluator:
                 GECModules.SPELLCHECKING
             }
 
-    def _construct_evaluators(self):
-        evaluators = {}
-
-        construction_map = {
-            GECModules.SPELLCHECKING: SpellcheckerModule,
-            GECModules.LANGUAGE_TOOL: LanguageToolModule,
-            GECModules.PUNCTUATION_SEEKER: PunctuationSeekerModule,
-            GECModules.LANGUAGE_SWITCH: LanguageSwitchModule,
-            GECModules.LEVENSHTEIN: LevenshteinModule,
-            GECModules.TOKEN_COUNT_DISTANCE: TokenCountDistanceModule,
-            GECModules.JACCARD: JaccardDistanceModule,
-            GECModules.BERTSCORE: BERTScoreModule,
-            GECModules.SENTENCE_BERT: SentenceBertModule,
-            GECModules.BLEURT: BleuRTModule,
-            GECModules.GLEU: GleuModule
-        }
-
-        for language in self.supported_languages:
-            print(f"Constructing evaluators for {language}...")
-            evaluators[language] = {}
-
-            for module, constructor in construction_map.items():
-                if module in self.per_language_modules[language]:
-                    evaluators[language][module] = constructor(language)
-
-        return evaluators
-
-    def _collect_original_texts(self, lang_data):
-        return [v["text"] for _, v in lang_data.items()]
-
-    def _collect_corrected_texts(self, lang_data, prompt_id, model_name):
-        result = []
-
-        for _, entry in lang_data.items():
-            for correction in entry["corrections"]:
-                if (
-                    correction["prompt_id"] == prompt_id
-                    and correction["model_name"] == model_name
-                ):
-                    result.append(correction["content"])
-        return result
-
-    def _get_prompt_ids(self, data):
-        prompt_ids = set()
-
-        for _, lang_obj in data.items():
-            for _, entry in lang_obj.items():
-                for correction in entry["corrections"]:
-                    prompt_ids.add(correction["prompt_id"])
-        return prompt_ids
-
-    def _get_model_names(self, data):
-        model_names = set()
-
-        for _, lang_obj in data.items():
-            for _, entry in lang_obj.items():
-                for correction in entry["corrections"]:
-                    model_names.add(correction["model_name"])
-        return model_names
+    def get_evaluator(self, language: str, module: GECModules) -> GECModule:
+        """Module for a language, constructed the first time it is requested"""
+        language_evaluators = self.evaluators.setdefault(language, {})
+        if module not in language_evaluators:
+            print(f"Constructing {module.name} evaluator for {language}...")
+            with span("construct", language=language, module=module.name):
+                language_evaluators[module] = self.construction_map[module](
+                    language, **self.module_options.get(module, {})
+                )
+            language_evaluators[module].score_cache = self.score_cache
+        return language_evaluators[module]
 
-    def load_dataset(self, data_path: str) -> Dict:
-        data = {}
-        with lzma.open(data_path, "r") as f:
-            json_bytes = f.read()
-            utf_data = json_bytes.decode("utf-8")
-            data = json.loads(utf_data)
-        return data
+    def build_index(self, data: Dict) -> CorrectionIndex:
+        return CorrectionIndex.from_data(data)
 
     def _aggregate_prompts(
         self,
@@ -159,7 +234,7 @@ class Evaluator:
         prompt_ids,
         model_names,
         language,
-        module,
+        module_name,
         original_avg_score,
         use_comparative_metrics,
     ):
@@ -171,7 +246,7 @@ class Evaluator:
             log_text = ""
             log_text += f"Aggregate over models Language: {language}"
             log_text += f"\t prompt: {prompt_id}"
-            log_text += f"\t metric: {self.evaluators[language][module].get_name()}"
+            log_text += f"\t metric: {module_name}"
             if not use_comparative_metrics:
                 log_text += f"\t score: {original_avg_score}->{avg_prompt_score}"
             else:
@@ -185,7 +260,7 @@ class Evaluator:
         prompt_ids,
         model_names,
         language,
-        module,
+        module_name,
         original_avg_score,
         use_comparative_metrics,
     ):
@@ -197,20 +272,285 @@ class Evaluator:
             log_text = ""
             log_text += f"Aggregate over prompts Language: {language}"
             log_text += f"\t model_name: {model_name}"
-            log_text += f"\t metric: {self.evaluators[language][module].get_name()}"
+            log_text += f"\t metric: {module_name}"
             if not use_comparative_metrics:
                 log_text += f"\t score: {original_avg_score}->{avg_model_score}"
             else:
                 log_text += f"\t score: {avg_model_score}"
             log_screen_file(log_text)
 
-    def _requirements_check_failed(self, use_comparative_metrics, evaluator):
-        if use_comparative_metrics and not evaluator.supports_references:
+    def _requirements_check_failed(self, use_comparative_metrics, module):
+        module_class = self.construction_map[module]
+        if use_comparative_metrics and not module_class.supports_references:
             return True
-        if not use_comparative_metrics and not evaluator.supports_single_texts:
+        if not use_comparative_metrics and not module_class.supports_single_texts:
             return True
         return False
 
+    def plan_units(
+        self, languages, use_comparative_metrics
+    ) -> List[Tuple[str, GECModules]]:
+        """(language, module) units evaluated for the languages, in order"""
+        units = []
+        for language in languages:
+            for module in sorted(
+                self.per_language_modules[language], key=lambda m: m.value
+            ):
+                if not self._requirements_check_failed(use_comparative_metrics, module):
+                    units.append((language, module))
+        return units
+
+    def evaluate_module(
+        self,
+        language_index: LanguageIndex,
+        module: GECModules,
+        prompt_ids,
+        model_names,
+        use_comparative_metrics=False,
+    ) -> ModuleResult:
+        """Score every (prompt_id, model_name) slice of a language with one module"""
+        evaluator = self.get_evaluator(language_index.language, module)
+        result = ModuleResult(
+            language=language_index.language,
+            module=module,
+            module_name=evaluator.get_name(),
+        )
+        use_single_texts = (
+            not use_comparative_metrics and evaluator.supports_single_texts
+        )
+
+        span_args = {"language": language_index.language, "module": module.name}
+        slice_keys = [(p, m) for p in prompt_ids for m in model_names]
+
+        # Duplicated texts and pairs across slices are scored once
+        with span("plan", **span_args):
+            correction_slices = [language_index.get_slice(*key) for key in slice_keys]
+            if use_single_texts:
+                plan = WorkPlan()
+                segments = [plan.add(language_index.original_texts)]
+                segments += [plan.add(s.texts) for s in correction_slices]
+            else:
+                plan = WorkPlan(evaluator.identity_score)
+                segments = [
+                    plan.add(language_index.get_aligned_originals(s), s.texts)
+                    for s in correction_slices
+                ]
+
+        with span("score", items=len(plan), planned=plan.num_items, **span_args):
+            unique_scores = []
+            if len(plan) and use_single_texts:
+                _, unique_scores = evaluator.get_average_score(plan.texts)
+            elif len(plan):
+                _, unique_scores = evaluator.get_average_pair_score(
+                    plan.texts, plan.references
+                )
+
+        segment_scores = plan.scatter(unique_scores, segments)
+        if use_single_texts:
+            result.original_scores = segment_scores.pop(0)
+            result.original_avg_score = np.mean(result.original_scores)
+        result.corrected_scores = dict(zip(slice_keys, segment_scores))
+
+        if not use_single_texts:
+            with span("corpus_score", **span_args):
+                result.corpus_statistics = self._corpus_statistics(
+                    evaluator, language_index, prompt_ids, model_names
+                )
+            result.corpus_score = corpus_ratio(result.corpus_statistics)
+        return result
+
+    def _corpus_statistics(
+        self, evaluator: GECModule, language_index, prompt_ids, model_names
+    ) -> Optional[Tuple[float, float]]:
+        originals, corrections = [], []
+        for prompt_id in prompt_ids:
+            for model_name in model_names:
+                correction_slice = language_index.get_slice(prompt_id, model_name)
+                originals.extend(language_index.get_aligned_originals(correction_slice))
+                corrections.extend(correction_slice.texts)
+        return evaluator.get_corpus_pair_statistics(originals, corrections)
+
+    def _report_module(
+        self, result: ModuleResult, prompt_ids, model_names, use_comparative_metrics
+    ):
+        log_screen_file("\n" + "-" * 80)
+
+        corrected_scores = defaultdict(dict)
+        for prompt_id in prompt_ids:
+            for model_name in model_names:
+                corrected_avg = np.mean(result.corrected_scores[(prompt_id, model_name)])
+                corrected_scores[prompt_id][model_name] = corrected_avg
+                log_screen_file(
+                    f"Language: {result.language}\t Model: {model_name}\t prompt: {prompt_id}\t metric: {result.module_name}\t score: {corrected_avg}"
+                )
+        self._aggregate_prompts(
+            corrected_scores,
+            prompt_ids,
+            model_names,
+            result.language,
+            result.module_name,
+            result.original_avg_score,
+            use_comparative_metrics,
+        )
+        self._aggregate_models(
+            corrected_scores,
+            prompt_ids,
+            model_names,
+            result.language,
+            result.module_name,
+            result.original_avg_score,
+            use_comparative_metrics,
+        )
+        if result.corpus_score is not None:
+            log_screen_file(
+                f"Corpus over prompts and models Language: {result.language}\t metric: {result.module_name}\t score: {result.corpus_score}"
+            )
+
+    def _log_missing_corrections(self, language_index, prompt_ids, model_names):
+        for prompt_id in prompt_ids:
+            for model_name in model_names:
+                missing = language_index.get_missing_entry_ids(prompt_id, model_name)
+                if missing:
+                    log_screen_file(
+                        f"Language: {language_index.language}\t Model: {model_name}\t prompt: {prompt_id}\t missing corrections: {len(missing)}/{len(language_index)}"
+                    )
+
+    def _report_detection(
+        self, language_index: LanguageIndex, prompt_ids, model_names, baseline_model
+    ):
+        with span("detection_f1", language=language_index.language):
+            report = detection_f1(
+                language_index, prompt_ids, model_names, baseline_model, self.tokenizer
+            )
+        for line in format_detection_report(report):
+            log_screen_file(line)
+
+    def _report_significance(
+        self,
+        result: ModuleResult,
+        language_index: LanguageIndex,
+        prompt_ids,
+        model_names,
+        bootstrap_samples,
+    ):
+        span_args = {"language": result.language, "module": result.module.name}
+        with span("significance", **span_args):
+            reports = model_significance(
+                result, language_index, prompt_ids, model_names, bootstrap_samples
+            )
+        for report in reports:
+            for line in format_significance_report(report):
+                log_screen_file(line)
+
+    def _make_pool(self, num_workers, threads_per_worker):
+        if num_workers <= 1:
+            return contextlib.nullcontext()
+        return ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                threads_per_worker,
+                self.module_options,
+                self.score_cache_path,
+                self.construction_map,
+                self.tokenizer,
+                profiler.enabled,
+            ),
+        )
+
+    def _run_units(
+        self,
+        language_index: LanguageIndex,
+        modules,
+        prompt_ids,
+        model_names,
+        use_comparative_metrics,
+        pool=None,
+    ) -> Iterator[ModuleResult]:
+        """
+        Unit results in plan order, whatever the number of workers. With a
+        pool the units are submitted right away, without one they are
+        evaluated as the results are consumed.
+        """
+        if pool is None:
+            return (
+                self.evaluate_module(
+                    language_index,
+                    module,
+                    prompt_ids,
+                    model_names,
+                    use_comparative_metrics,
+                )
+                for module in modules
+            )
+
+        futures = [
+            pool.submit(
+                _evaluate_unit,
+                language_index,
+                module,
+                prompt_ids,
+                model_names,
+                use_comparative_metrics,
+            )
+            for module in modules
+        ]
+        return self._collect_results(futures)
+
+    @staticmethod
+    def _collect_results(futures) -> Iterator[ModuleResult]:
+        for future in futures:
+            result = future.result()
+            profiler.extend(result.trace_events)
+            result.trace_events = []
+            yield result
+
+    def iter_language_indexes(
+        self, data_path: str, languages, prompt_ids=None, model_names=None
+    ) -> Iterator[LanguageIndex]:
+        """
+        Stream the dataset one requested language at a time. Columnar datasets
+        are read in the requested order and raise KeyError for a language they
+        do not contain. JSON and JSONL files are parsed one language after the
+        other, so their languages come in file order, and requested languages
+        that never appear are reported once the file has been read.
+        """
+        if is_columnar(data_path):
+            with span("load_dataset"):
+                dataset = ColumnarDataset(data_path)
+            missing = [lang for lang in languages if lang not in dataset.languages]
+            if missing:
+                raise KeyError(f"{data_path} has no data for {', '.join(missing)}")
+            for language in dict.fromkeys(languages):
+                with span("build_index", language=language):
+                    language_index = dataset.language_index(
+                        language, prompt_ids, model_names
+                    )
+                yield language_index
+            return
+
+        found = set()
+        languages_data = iter_merged_languages(data_path)
+        while True:
+            # The file is parsed lazily, one language per step
+            with span("load_dataset") as span_args:
+                language, lang_data = next(languages_data, (None, None))
+                if language is not None:
+                    span_args.update(language=language, items=len(lang_data))
+            if language is None:
+                break
+            if language in languages:
+                found.add(language)
+                with span("build_index", language=language, items=len(lang_data)):
+                    language_index = LanguageIndex.from_data(language, lang_data)
+                yield language_index
+        missing = [lang for lang in languages if lang not in found]
+        if missing:
+            log_screen_file(
+                f"Warning: {data_path} has no data for {', '.join(missing)}"
+            )
+
     def evaluate(
         self,
         json_path,
@@ -218,78 +558,175 @@ class Evaluator:
         prompt_ids=None,
         model_names=None,
         languages=None,
+        num_workers=1,
+        threads_per_worker=1,
+        score_store_path=None,
+        report_detection_f1=False,
+        baseline_model=BASELINE_MODEL,
+        bootstrap_samples=0,
+        shard: Optional[Shard] = None,
     ):
-        data = self.load_dataset(json_path)
-
-        if not prompt_ids:
-            prompt_ids = self._get_prompt_ids(data)
-        if not model_names:
-            model_names = self._get_model_names(data)
+        """
+        Languages are read one at a time from JSONL and columnar data, and
+        the nested JSON format is loaded whole first (see iter_merged_entries).
+        With a shard, only its part of the work is evaluated and nothing is
+        reported: its per-sentence scores are saved to score_store_path, to be
+        combined with sharding.merge_shards
+        """
         languages = languages if languages else self.supported_languages
+        score_store = ScoreStoreWriter() if score_store_path else None
+        if shard is not None and score_store is None:
+            raise ValueError("A shard needs a score_store_path to save its results")
+        if shard is not None and (report_detection_f1 or bootstrap_samples):
+            # merge_shards reports neither, so they would be silently dropped
+            raise ValueError(
+                "Detection F1 and bootstrap significance are not supported with a shard"
+            )
+        shard_plan = {"languages": {}, "units": [], "corpus_statistics": []}
+        unit_position = 0
+        # Columnar data decodes only the selected models, the detection report
+        # also needs the baseline model
+        decoded_model_names = model_names
+        if report_detection_f1 and model_names and baseline_model not in model_names:
+            decoded_model_names = list(model_names) + [baseline_model]
+
+        def report(run: LanguageRun):
+            if run.log_missing:
+                self._log_missing_corrections(
+                    run.language_index, run.prompt_ids, run.model_names
+                )
+            if report_detection_f1 and shard is None:
+                self._report_detection(
+                    run.language_index, run.prompt_ids, run.model_names, baseline_model
+                )
 
-        for language in languages:
-            original_texts = self._collect_original_texts(data[language])
-
-            for module in self.per_language_modules[language]:
-                evaluator = self.evaluators[language][module]
-
-                if self._requirements_check_failed(use_comparative_metrics, evaluator):
+            for result in run.results:
+                if shard is not None:
+                    score_store.add_language(run.full_index)
+                    score_store.add_result(
+                        result,
+                        run.language_index,
+                        getattr(run.language_index, "global_positions", None),
+                    )
+                    shard_plan["units"].append([result.language, result.module.name])
+                    shard_plan["corpus_statistics"].append(
+                        [result.language, result.module.name, result.corpus_statistics]
+                    )
                     continue
 
-                log_screen_file("\n" + "-" * 80)
-
-                if not use_comparative_metrics and evaluator.supports_single_texts:
-                    original_avg_score = evaluator.get_average_score(original_texts)
-                else:
-                    original_avg_score = 0.0
-
-                corrected_scores = defaultdict(dict)
-
-                for prompt_id in prompt_ids:
-                    for model_name in model_names:
-                        corrected_texts = self._collect_corrected_texts(
-                            data[language], prompt_id=prompt_id, model_name=model_name
-                        )
-                        if (
-                            not use_comparative_metrics
-                            and evaluator.supports_single_texts
-                        ):
-                            corrected_avg, scores = evaluator.get_average_score(
-                                corrected_texts
-                            )
-                        else:
-                            corrected_avg, scores = evaluator.get_average_pair_score(
-                                original_texts, corrected_texts
-                            )
-
-                        corrected_scores[prompt_id][model_name] = corrected_avg
-                        log_screen_file(
-                            f"Language: {language}\t Model: {model_name}\t prompt: {prompt_id}\t metric: {self.evaluators[language][module].get_name()}\t score: {corrected_avg}"
-                        )
-                self._aggregate_prompts(
-                    corrected_scores,
-                    prompt_ids,
-                    model_names,
-                    language,
-                    module,
-                    original_avg_score,
-                    use_comparative_metrics,
+                self._report_module(
+                    result, run.prompt_ids, run.model_names, use_comparative_metrics
                 )
-                self._aggregate_models(
-                    corrected_scores,
-                    prompt_ids,
-                    model_names,
-                    language,
-                    module,
-                    original_avg_score,
-                    use_comparative_metrics,
+                if bootstrap_samples:
+                    self._report_significance(
+                        result,
+                        run.language_index,
+                        run.prompt_ids,
+                        run.model_names,
+                        bootstrap_samples,
+                    )
+                if score_store is not None:
+                    score_store.add_result(result, run.language_index)
+
+        # With workers, the units of the next languages are submitted before
+        # the results of the current one are reported, so units of different
+        # languages overlap and the pool does not drain at language boundaries
+        languages_in_flight = LANGUAGES_IN_FLIGHT if num_workers > 1 else 1
+        runs = deque()
+        pool_context = self._make_pool(num_workers, threads_per_worker)
+        with span("evaluate"), pool_context as pool:
+            for language_position, language_index in enumerate(
+                self.iter_language_indexes(
+                    json_path, languages, prompt_ids, decoded_model_names
+                )
+            ):
+                language_prompt_ids = prompt_ids or sorted(language_index.prompt_ids)
+                language_model_names = model_names or sorted(
+                    language_index.model_names
                 )
+                units = self.plan_units(
+                    [language_index.language], use_comparative_metrics
+                )
+                full_index = language_index
+                log_missing = True
+                if shard is not None:
+                    shard_plan["languages"][language_index.language] = {
+                        "prompt_ids": language_prompt_ids,
+                        "model_names": language_model_names,
+                    }
+                    # One shard logs the missing corrections of a language, or
+                    # by entry, each shard those of its entries
+                    if shard.by == "language":
+                        log_missing = shard.owns(language_position)
+                    elif shard.by == "module":
+                        log_missing = shard.owns(unit_position)
+                    units, unit_position = self._shard_units(
+                        shard, units, language_position, unit_position
+                    )
+                    if shard.by == "entry":
+                        language_index = full_index.subset(
+                            shard.entry_positions(full_index.entry_ids)
+                        )
+                        if not len(language_index):
+                            units = []
+
+                runs.append(
+                    LanguageRun(
+                        language_index,
+                        full_index,
+                        language_prompt_ids,
+                        language_model_names,
+                        log_missing,
+                        self._run_units(
+                            language_index,
+                            [module for _, module in units],
+                            language_prompt_ids,
+                            language_model_names,
+                            use_comparative_metrics,
+                            pool,
+                        ),
+                    )
+                )
+                if len(runs) >= languages_in_flight:
+                    report(runs.popleft())
+            while runs:
+                report(runs.popleft())
+
+        if score_store is not None:
+            if shard is not None:
+                score_store.extra_meta["evaluation"] = {
+                    "shard": shard.to_json(),
+                    "comparative": use_comparative_metrics,
+                    **shard_plan,
+                }
+            with span("save_score_store"):
+                score_store.save(score_store_path)
+
+    def _shard_units(self, shard: Shard, units, language_position, unit_position):
+        """Units of a language evaluated by the shard, and the next unit position"""
+        if shard.by == "language":
+            owned = units if shard.owns(language_position) else []
+        elif shard.by == "module":
+            owned = [
+                unit
+                for offset, unit in enumerate(units)
+                if shard.owns(unit_position + offset)
+            ]
+        else:
+            owned = units
+        return owned, unit_position + len(units)
 
     def close(self):
-        for language in self.supported_languages:
+        for language, language_evaluators in self.evaluators.items():
             print(f"Closing evaluators for {language}...")
-            for module in self.evaluators[language].keys():
-                self.evaluators[language][module].close()
+            for evaluator in language_evaluators.values():
+                evaluator.close()
+        # Models stay in shared_models, other evaluators of this process may
+        # use them
+        self.evaluators = {}
+        if self.score_cache is not None:
+            self.score_cache.close()
+            self.score_cache = None
 
 
 if __name__ == "__main__":
@@ -297,7 +734,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "-e",
         "--experiment_output_path",
-        help="JSON data.",
+        help="Merged JSON data (.json.xz, loaded whole), JSONL (.jsonl.xz, streamed "
+        "one language at a time) or a columnar dataset directory",
         default="./data/merged_multillm.json.xz",
     )
 
@@ -311,7 +749,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "-l",
         "--languages",
-        help="Languages to evaluate, comma-separated",
+        help="Languages to evaluate, comma-separated. Columnar datasets are "
+        "evaluated in this order, JSON and JSONL files in file order",
         default="en,de,it,sv"
     )
 
@@ -322,18 +761,159 @@ if __name__ == "__main__":
         default="2"
     )
 
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of worker processes evaluating (language, module) units",
+        type=int,
+        default=1
+    )
+
+    parser.add_argument(
+        "--threads_per_worker",
+        help="Torch threads per worker process",
+        type=int,
+        default=1
+    )
+
+    parser.add_argument(
+        "--lt_servers",
+        help="Local LanguageTool servers per language checked concurrently",
+        type=int,
+        default=1
+    )
+
+    parser.add_argument(
+        "--lt_url",
+        help="URL of an already running LanguageTool server to use instead",
+        default=None
+    )
+
+    parser.add_argument(
+        "--lt_incremental",
+        help="Check LanguageTool sentence by sentence, re-checking only new "
+        "sentences. Matches of rules spanning a sentence boundary are lost",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--score_cache",
+        help="SQLite file caching scores between runs",
+        default=None
+    )
+
+    parser.add_argument(
+        "--score_store",
+        help="Directory to save per-sentence scores to, see score_store.ScoreStore",
+        default=None
+    )
+
+    parser.add_argument(
+        "--tokenizer",
+        help="Tokenizer of the lexical metrics (Jaccard, token count, GLEU) and "
+        "of the detection report: nltk (word_tokenize) or regex",
+        choices=["nltk", "regex"],
+        default="nltk"
+    )
+
+    parser.add_argument(
+        "--levenshtein_variant",
+        help="Levenshtein score: inverse, 1 / (1 + distance), or normalized, "
+        "1 - distance / max(length)",
+        choices=["inverse", "normalized"],
+        default="inverse"
+    )
+
+    parser.add_argument(
+        "--detection_f1",
+        help="Also report change-detection precision/recall/F1 per model and prompt",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--baseline_model",
+        help="Model whose corrections define the always_zero/always_one baselines",
+        default=BASELINE_MODEL
+    )
+
+    parser.add_argument(
+        "--bootstrap_samples",
+        help="Report bootstrap CIs and paired bootstrap/permutation tests of every "
+        "model pair with this many resamples, 0 to skip",
+        type=int,
+        default=0
+    )
+
+    parser.add_argument(
+        "--shard",
+        help="Evaluate only shard i/N (i from 0) and save its partial results to "
+        "--score_store; merge them with sharding.py. Not combinable with "
+        "--detection_f1 or --bootstrap_samples",
+        default=None
+    )
+
+    parser.add_argument(
+        "--shard_by",
+        help="Split shards by language, (language, module) unit or entry id hash",
+        choices=SHARD_BY,
+        default="language"
+    )
+
+    parser.add_argument(
+        "--trace",
+        help="Profile the run and save a Chrome trace (chrome://tracing) JSON here",
+        default=None
+    )
+
+    parser.add_argument(
+        "--spell_dictionaries",
+        help="Directory of precompiled spell checker dictionaries, compiled on first use",
+        default=None
+    )
+
     args = parser.parse_args()
+    if args.shard and (args.detection_f1 or args.bootstrap_samples):
+        parser.error(
+            "--shard cannot be combined with --detection_f1 or --bootstrap_samples"
+        )
     experiment_path = args.experiment_output_path
     model_names = args.models.split(",")
     languages = args.languages.split(",")
     prompt_ids = [int(p) for p in args.prompt_ids.split(",")]
-
-    evaluator = Evaluator()
+    if args.trace:
+        profiler.enable()
+
+    evaluator = Evaluator(
+        module_options={
+            GECModules.LANGUAGE_TOOL: {
+                "num_servers": args.lt_servers,
+                "remote_server": args.lt_url,
+                "incremental": args.lt_incremental,
+            },
+            GECModules.SPELLCHECKING: {"dictionary_dir": args.spell_dictionaries},
+            GECModules.LEVENSHTEIN: {"variant": args.levenshtein_variant},
+        },
+        score_cache_path=args.score_cache,
+        tokenizer=args.tokenizer,
+    )
     evaluator.evaluate(
         experiment_path,
         use_comparative_metrics=True,
         prompt_ids=prompt_ids,
         languages=languages,
-        model_names=model_names
+        model_names=model_names,
+        num_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        score_store_path=args.score_store,
+        report_detection_f1=args.detection_f1,
+        baseline_model=args.baseline_model,
+        bootstrap_samples=args.bootstrap_samples,
+        shard=Shard.parse(args.shard, args.shard_by) if args.shard else None,
     )
     evaluator.close()
+    if args.trace:
+        profiler.save(args.trace)
+        for row in profiler.summary():
+            log_screen_file(
+                f"Profile: {row['name']}\t language: {row['language']}\t module: {row['module']}\t calls: {row['calls']}\t wall: {row['wall_ms']:.1f} ms\t cpu: {row['cpu_ms']:.1f} ms\t items: {row['items']}\t process peak RSS so far: {row['process_peak_rss_mb']:.0f} MB"
+            )
@@ -1,40 +1,217 @@
+import argparse
 import json
+import lzma
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
+from geceval.columnar_store import ColumnarDataset, is_columnar, write_columnar
 
-def load_multi_llm_json_outputs(dir: str) -> Dict:
+# Fewer output files per worker process are parsed faster in-process
+MIN_FILES_PER_WORKER = 4
+
+
+def _parse_llm_output(path: Path) -> Tuple[str, int, Dict]:
+    """Model, prompt and the (id, label, content, processed) tuples of each
+    language, a fraction of the parsed file to send back from a worker"""
+    raw_filename = path.stem
+    model_id = raw_filename.split("_")[0]
+    prompt_id = raw_filename.split("_")[-1]
+    with open(str(path)) as f:
+        data = json.load(f)
+    return (
+        model_id,
+        int(prompt_id),
+        {
+            lang: [
+                (elem["id"], elem["label"], elem["content"], elem["processed"])
+                for elem in elements
+            ]
+            for lang, elements in data.items()
+        },
+    )
+
+
+def _parse_llm_outputs(pathlist, num_workers: Optional[int]):
+    num_workers = min(
+        num_workers or os.cpu_count() or 1, len(pathlist) // MIN_FILES_PER_WORKER
+    )
+    if num_workers <= 1:
+        yield from map(_parse_llm_output, pathlist)
+        return
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        yield from pool.map(_parse_llm_output, pathlist)
+
+
+def _is_directory_path(path: str) -> bool:
+    return path.endswith(("/", os.sep)) or Path(path).is_dir() or not Path(path).suffix
+
+
+def _iter_nested_entries(data: Dict) -> Iterator[Tuple[str, str, Dict]]:
+    for lang, lang_data in data.items():
+        for id, entry in lang_data.items():
+            yield lang, id, entry
+
+
+def write_merged(data: Dict, output_path: str):
+    """
+    Write a merged dataset once, in the format given by the output path:
+    .json (indented), .json.xz, .jsonl[.xz] or a columnar directory, given as
+    a path without suffix, ending with a separator or an existing directory
+    """
+    output_path = str(output_path)
+    if is_jsonl(output_path):
+        write_merged_jsonl(_iter_nested_entries(data), output_path)
+    elif output_path.endswith(".json"):
+        with open_text(output_path, "w") as out:
+            json.dump(data, out, indent=4, ensure_ascii=False)
+    elif output_path.endswith(".json.xz"):
+        with open_text(output_path, "w") as out:
+            json.dump(data, out, ensure_ascii=False)
+    elif _is_directory_path(output_path):
+        write_columnar(_iter_nested_entries(data), output_path)
+    else:
+        raise ValueError(f"Unknown merged dataset format: {output_path}")
+
+
+def load_multi_llm_json_outputs(
+    dir: str,
+    output_path: str = "merged_multillm.json",
+    num_workers: Optional[int] = None,
+    only_new: bool = False,
+) -> Dict:
+    """
+    Merge per-model/per-prompt output files (<model>_..._<prompt>.json) found
+    under dir. Files are parsed in parallel when there are enough of them,
+    and the merged dataset is written once. With only_new, an existing dataset at output_path is extended with
+    the (model, prompt) pairs it does not contain yet.
+    """
     result = {}
-    pathlist = Path(dir).glob("**/*.json")
-    for path in pathlist:
-        raw_filename = path.stem
-        model_id = raw_filename.split("_")[0]
-        prompt_id = raw_filename.split("_")[-1]
-        with open(str(path)) as f:
-            data = json.loads(f.read())
-            for lang in data:
-                if lang not in result:
-                    result[lang] = {}
-                for elem in data[lang]:
-                    id = elem["id"]
-                    if id not in result[lang]:
-                        result[lang][id] = {
-                            "marked_correct": elem["label"],
-                            "text": elem["content"],
-                            "corrections": [],
-                        }
-                    result[lang][id]["corrections"].append(
-                        {
-                            "prompt_id": int(prompt_id),
-                            "content": elem["processed"],
-                            "model_name": model_id,
-                        }
-                    )
-        with open("merged_multillm.json", "w") as out:
-            out.write(json.dumps(result, indent=4, ensure_ascii=False))
+    merged_pairs = set()
+    if only_new and Path(output_path).exists():
+        result = dict(iter_merged_languages(output_path))
+        for _, _, entry in _iter_nested_entries(result):
+            for correction in entry["corrections"]:
+                merged_pairs.add((correction["model_name"], correction["prompt_id"]))
+
+    pathlist = []
+    for path in sorted(Path(dir).glob("**/*.json")):
+        model_id = path.stem.split("_")[0]
+        prompt_id = path.stem.split("_")[-1]
+        if (model_id, int(prompt_id)) not in merged_pairs:
+            pathlist.append(path)
+
+    for model_id, prompt_id, data in _parse_llm_outputs(pathlist, num_workers):
+        for lang in data:
+            if lang not in result:
+                result[lang] = {}
+            for id, label, content, processed in data[lang]:
+                if id not in result[lang]:
+                    result[lang][id] = {
+                        "marked_correct": label,
+                        "text": content,
+                        "corrections": [],
+                    }
+                result[lang][id]["corrections"].append(
+                    {
+                        "prompt_id": prompt_id,
+                        "content": processed,
+                        "model_name": model_id,
+                    }
+                )
+
+    write_merged(result, output_path)
     return result
 
 
+def open_text(path: str, mode: str = "r"):
+    """Open a text file, transparently (de)compressing .xz files"""
+    if str(path).endswith(".xz"):
+        return lzma.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def is_jsonl(path: str) -> bool:
+    return str(path).endswith((".jsonl", ".jsonl.xz"))
+
+
+def load_merged_json(path: str) -> Dict:
+    with open_text(path) as f:
+        return json.load(f)
+
+
+def iter_merged_entries(path: str) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Yield (language, entry_id, entry) from a merged multi-LLM dataset.
+    JSONL files, one entry per line, are decompressed and parsed incrementally,
+    columnar directories one language at a time; the nested JSON format has
+    to be parsed as a whole first.
+    """
+    if is_columnar(path):
+        for language, lang_data in ColumnarDataset(path).iter_languages():
+            for entry_id, entry in lang_data.items():
+                yield language, entry_id, entry
+    elif is_jsonl(path):
+        with open_text(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                yield entry.pop("language"), entry.pop("id"), entry
+    else:
+        data = load_merged_json(path)
+        for language in list(data):
+            lang_data = data.pop(language)
+            for entry_id, entry in lang_data.items():
+                yield language, entry_id, entry
+
+
+def iter_merged_languages(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (language, {entry_id: entry}) one language at a time. For JSONL files
+    and columnar directories, peak memory is then bounded by the largest
+    language; a nested JSON file is still parsed whole. JSONL files must keep
+    the entries of a language contiguous, which write_merged_jsonl guarantees.
+    Columnar dataset directories are read through their memory-mapped columns.
+    """
+    if is_columnar(path):
+        yield from ColumnarDataset(path).iter_languages()
+        return
+
+    seen = set()
+    language, lang_data = None, {}
+    for entry_language, entry_id, entry in iter_merged_entries(path):
+        if entry_language != language:
+            if language is not None:
+                yield language, lang_data
+            if entry_language in seen:
+                raise ValueError(
+                    f"{path}: entries of language {entry_language} are not contiguous"
+                )
+            seen.add(entry_language)
+            language, lang_data = entry_language, {}
+        lang_data[entry_id] = entry
+    if language is not None:
+        yield language, lang_data
+
+
+def write_merged_jsonl(entries: Iterable[Tuple[str, str, Dict]], path: str):
+    """Write (language, entry_id, entry) triples, grouped by language, as JSONL"""
+    with open_text(path, "w") as out:
+        for language, entry_id, entry in entries:
+            out.write(
+                json.dumps(
+                    {"language": language, "id": entry_id, **entry}, ensure_ascii=False
+                )
+            )
+            out.write("\n")
+
+
+def convert_merged_json_to_jsonl(json_path: str, jsonl_path: str):
+    write_merged_jsonl(iter_merged_entries(json_path), jsonl_path)
+
+
 def read_input(path: str):
     if path.endswith("json"):
         return read_triton_request(path)
@@ -62,3 +239,46 @@ def read_triton_output(path: str):
 def read_raw_file(path: str):
     with open(path, "r") as f:
         return f.read().strip()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge and convert multi-LLM datasets. The output format "
+        "follows the output path: .json, .json.xz, .jsonl[.xz] or a columnar "
+        "directory (a path without suffix or ending with /)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge per-model/per-prompt output files"
+    )
+    merge_parser.add_argument("input_dir", help="Directory with the JSON outputs")
+    merge_parser.add_argument("output_path", help="Merged dataset path")
+    merge_parser.add_argument(
+        "-w", "--workers", help="Parser processes", type=int, default=None
+    )
+    merge_parser.add_argument(
+        "--only_new",
+        help="Only add (model, prompt) outputs missing from an existing output",
+        action="store_true",
+    )
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert a merged dataset to another format"
+    )
+    convert_parser.add_argument("input_path", help="Merged dataset")
+    convert_parser.add_argument("output_path", help="Converted dataset path")
+
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        load_multi_llm_json_outputs(
+            args.input_dir,
+            args.output_path,
+            num_workers=args.workers,
+            only_new=args.only_new,
+        )
+    elif is_jsonl(args.output_path):
+        convert_merged_json_to_jsonl(args.input_path, args.output_path)
+    else:
+        write_merged(dict(iter_merged_languages(args.input_path)), args.output_path)
@@ -1,19 +1,44 @@
+from collections import defaultdict
+from typing import Dict, List
+
+import bert_score
+import torch
 from bert_score import BERTScorer
+from bert_score.utils import get_bert_embedding, greedy_cos_idf
+from torch.nn.utils.rnn import pad_sequence
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.memo import LRUMemo
+from geceval.modules.model_registry import shared_models
 
 
 class BERTScoreModule(GECModule):
-    def __init__(self, language="en", multilingual_model_for_en=True):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
+    def __init__(
+        self,
+        language="en",
+        multilingual_model_for_en=True,
+        batch_size: int = 64,
+        max_cached_texts: int = 1024,
+    ):
         self.language = language
+        self.batch_size = batch_size
 
         if language == "en" and not multilingual_model_for_en:
-            self.scorer = BERTScorer(model_type="bert-base-uncased")
+            model_type = "bert-base-uncased"
         else:
-            self.scorer = BERTScorer(model_type="bert-base-multilingual-cased")
+            model_type = "bert-base-multilingual-cased"
+        self.scorer = shared_models.get(
+            ("bertscore", model_type), lambda: BERTScorer(model_type=model_type)
+        )
 
-        self.supports_single_texts = False
-        self.supports_references = True
+        # Token embeddings and idf weights of the most recent originals, which
+        # are shared by every (prompt, model) slice of a language. Capped, as
+        # an essay-length text takes megabytes.
+        self.text_stats = LRUMemo(max_cached_texts)
 
     def score(self, text: str) -> float:
         pass
@@ -22,11 +47,104 @@ class BERTScoreModule(GECModule):
         _, _, f1 = self.scorer.score([text], [reference])
         return f1.item()
 
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        if not texts:
+            return []
+        device = self.scorer.device
+        # Pairs are scored in batches sorted by length, so padding stays small
+        # and only one batch of embeddings is held besides the capped cache
+        order = sorted(
+            range(len(texts)),
+            key=lambda i: len(references[i].split(" ")),
+            reverse=True,
+        )
+
+        f1 = torch.zeros(len(texts))
+        with torch.no_grad():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start : start + self.batch_size]
+                batch_texts = [texts[i] for i in batch]
+                batch_references = [references[i] for i in batch]
+                text_stats = self._cached_stats(batch_texts)
+                reference_stats = self._embed(batch_references, {})
+                # BERTScorer.score(cands=texts, refs=references) argument order
+                _, _, batch_f1 = greedy_cos_idf(
+                    *self._pad(batch_references, reference_stats, device),
+                    *self._pad(batch_texts, text_stats, device),
+                    self.scorer.all_layers,
+                )
+                f1[torch.tensor(batch)] = batch_f1.cpu()
+
+        if self.scorer.rescale_with_baseline:
+            baseline = self.scorer.baseline_vals[2]
+            f1 = (f1 - baseline) / (1 - baseline)
+        return f1.tolist()
+
+    def _idf_dict(self):
+        if self.scorer.idf:
+            return self.scorer._idf_dict
+        idf_dict = defaultdict(lambda: 1.0)
+        idf_dict[self.scorer._tokenizer.sep_token_id] = 0
+        idf_dict[self.scorer._tokenizer.cls_token_id] = 0
+        return idf_dict
+
+    def _cached_stats(self, sentences: List[str]) -> Dict:
+        """Stats of the sentences, embedding only those not in text_stats"""
+        stats = self.text_stats.get_many(set(sentences))
+        self._embed(sentences, stats)
+        for sentence, sentence_stats in stats.items():
+            self.text_stats[sentence] = sentence_stats
+        return stats
+
+    def _embed(self, sentences: List[str], stats: Dict) -> Dict:
+        missing = sorted(
+            set(sentences) - stats.keys(), key=lambda x: len(x.split(" ")), reverse=True
+        )
+        idf_dict = self._idf_dict()
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            embeddings, masks, padded_idf = get_bert_embedding(
+                batch,
+                self.scorer._model,
+                self.scorer._tokenizer,
+                idf_dict,
+                device=self.scorer.device,
+                all_layers=self.scorer.all_layers,
+            )
+            embeddings = embeddings.cpu()
+            masks = masks.cpu()
+            padded_idf = padded_idf.cpu()
+            for i, sentence in enumerate(batch):
+                sequence_len = masks[i].sum().item()
+                stats[sentence] = (
+                    embeddings[i, :sequence_len],
+                    padded_idf[i, :sequence_len],
+                )
+        return stats
+
+    def _pad(self, sentences: List[str], stats: Dict, device):
+        embeddings, idfs = zip(*[stats[sentence] for sentence in sentences])
+        lens = torch.tensor([e.size(0) for e in embeddings], dtype=torch.long)
+        embedding_pad = pad_sequence(
+            [e.to(device) for e in embeddings], batch_first=True, padding_value=2.0
+        )
+        idf_pad = pad_sequence([i.to(device) for i in idfs], batch_first=True)
+        mask = torch.arange(int(lens.max())).expand(len(lens), -1) < lens.unsqueeze(1)
+        return embedding_pad, mask.to(device), idf_pad
+
+    def get_config(self) -> str:
+        return (
+            f"{self.scorer.model_type}|idf={self.scorer.idf}"
+            f"|baseline={self.scorer.rescale_with_baseline}"
+            f"|bert_score={bert_score.__version__}"
+        )
+
     def explain_errors(self, text: str):
         pass
 
     def close(self):
-        pass
+        self.text_stats.clear()
 
     def get_name(self):
         return "BERT Score"
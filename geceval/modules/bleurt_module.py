@@ -1,18 +1,30 @@
+from typing import List
+
 import evaluate
+import numpy as np
 import torch
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.model_registry import shared_models
 
 
 class BleuRTModule(GECModule):
-    def __init__(self, language: str, model_name: str = "BLEURT-20-D12"):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = None
+
+    def __init__(
+        self, language: str, model_name: str = "BLEURT-20-D12", batch_size: int = 64
+    ):
         self.model_name = model_name
-        self.supports_single_texts = False
-        self.supports_references = True
+        self.batch_size = batch_size
         self.language = language
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         # self.model = SentenceTransformer(model_name, device=self.device)
-        self.model = evaluate.load("bleurt", self.model_name, module_type="metric")
+        self.model = shared_models.get(
+            ("bleurt", self.model_name),
+            lambda: evaluate.load("bleurt", self.model_name, module_type="metric"),
+        )
 
     def score(self, text: str) -> float:
         pass
@@ -21,13 +33,30 @@ class BleuRTModule(GECModule):
         bleurt_scores = self.model.compute(predictions=[text], references=[reference])
         return bleurt_scores["scores"][0]
 
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        # Length-sorted chunks keep the padding inside each chunk small
+        lengths = [max(len(t), len(r)) for t, r in zip(texts, references)]
+        order = np.argsort(lengths, kind="stable")
+        scores = np.zeros(len(order))
+
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start : start + self.batch_size]
+            bleurt_scores = self.model.compute(
+                predictions=[texts[i] for i in chunk],
+                references=[references[i] for i in chunk],
+            )
+            scores[chunk] = bleurt_scores["scores"]
+        return scores.tolist()
+
+    def get_config(self) -> str:
+        return self.model_name
+
     def explain_errors(self, text: str):
         pass
 
     def close(self):
-        del self.model
-        if self.device == "cuda":
-            torch.cuda.empty_cache()
+        # The model itself stays in shared_models for other modules
+        self.model = None
 
     def get_name(self):
         return "BleuRT"
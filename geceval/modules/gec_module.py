@@ -1,14 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 
 import numpy as np
 
+from geceval.score_cache import score_with_cache
+
+
+def corpus_ratio(statistics: Optional[Tuple[float, float]]) -> Optional[float]:
+    if statistics is None:
+        return None
+    numerator, denominator = statistics
+    return numerator / denominator if denominator > 0 else 0.0
+
 
 class GECModule(ABC):
     """
     Abstract class for unsupervised grammatical correction evaluation
     """
 
+    # Optional persistent ScoreCache, set by the evaluator
+    score_cache = None
+    # Score of a non-empty text paired with itself, used instead of scoring
+    # unchanged corrections; None if the metric has to compute it
+    identity_score = None
+
     def set_language(self, language: str):
         """Set language so that e.g., spellchecker knows how to operate"""
         self.language = language
@@ -21,16 +36,64 @@ class GECModule(ABC):
 
     def get_average_score(self, texts: List[str]):
         """Score a given set of texts based on a given GEC metric"""
-        scores = [self.score(text) for text in texts]
+        if self.score_cache is None:
+            scores = self.score_texts(texts)
+        else:
+            scores = score_with_cache(
+                self.score_cache,
+                self.get_cache_namespace(),
+                texts,
+                None,
+                self.score_texts,
+            )
         return np.mean(scores), scores
 
+    def score_texts(self, texts: List[str]) -> List[float]:
+        """Score a list of texts, modules override it to batch"""
+        return [self.score(text) for text in texts]
+
     def get_average_pair_score(self, texts: List[str], references: List[str]):
         """Score a given set of texts based on a given GEC metric"""
-        scores = [
+        if self.score_cache is None:
+            scores = self.score_pairs(texts, references)
+        else:
+            scores = score_with_cache(
+                self.score_cache,
+                self.get_cache_namespace(),
+                texts,
+                references,
+                self.score_pairs,
+            )
+        return np.mean(scores), scores
+
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        """Score aligned text/reference lists, modules override it to batch.
+        The evaluator passes the originals as `texts`, so they are the side
+        worth caching across (prompt, model) slices"""
+        return [
             self.score_pair(text, reference)
             for text, reference in zip(texts, references)
         ]
-        return np.mean(scores), scores
+
+    def get_corpus_pair_statistics(
+        self, texts: List[str], references: List[str]
+    ) -> Optional[Tuple[float, float]]:
+        """Numerator and denominator of a corpus-level score, for metrics that
+        are not the average of their sentence scores, e.g. GLEU. Statistics of
+        disjoint parts of a corpus add up."""
+        return None
+
+    def get_corpus_pair_score(
+        self, texts: List[str], references: List[str]
+    ) -> Optional[float]:
+        return corpus_ratio(self.get_corpus_pair_statistics(texts, references))
+
+    def get_config(self) -> str:
+        """Settings that change the scores of the module, e.g. model version"""
+        return ""
+
+    def get_cache_namespace(self) -> str:
+        return f"{self.get_name()}|{self.get_config()}|{self.language}"
 
     def close(self):
         pass
@@ -0,0 +1,121 @@
+from typing import List, Tuple
+
+import nltk
+import numpy as np
+
+from geceval.modules.gec_module import GECModule
+from geceval.modules.lexical_engine import get_lexical_engine
+from geceval.modules.memo import MAX_MEMO_ITEMS, LRUMemo
+
+# The n-gram vocabulary is dropped and rebuilt once it grows past this size
+MAX_NGRAM_IDS = 10 * MAX_MEMO_ITEMS
+
+
+class GleuModule(GECModule):
+    """
+    GLEU as in nltk.translate.gleu_score: n-grams of orders min_len..max_len,
+    sentence score tp / max(tpfp, tpfn), corpus score sum(tp) / sum(max(...)).
+    N-grams are mapped to integer ids once per unique text, so the tables of
+    the originals are shared by all (prompt, model) slices and the matching
+    of a whole batch is a few numpy calls.
+    """
+
+    supports_single_texts = False
+    supports_references = True
+
+    @property
+    def identity_score(self):
+        # A non-blank text has at least one token, but may have fewer than
+        # min_len, and then no n-grams and a score of 0 against itself
+        return 1.0 if self.min_len <= 1 else None
+
+    def __init__(self, language="en", min_len=1, max_len=4, tokenizer="nltk"):
+        self.set_language(language)
+        self.min_len = min_len
+        self.max_len = max_len
+        self.tokenizer = tokenizer
+        self.engine = get_lexical_engine(language, tokenizer)
+        self.ngram_ids = {}
+        self.text_ngrams = LRUMemo()
+
+    def _ngrams(self, text: str) -> np.ndarray:
+        ngrams = self.text_ngrams.get(text)
+        if ngrams is None:
+            tokens = self.engine.get_tokens(text)
+            ids = []
+            for n in range(self.min_len, self.max_len + 1):
+                for i in range(len(tokens) - n + 1):
+                    ngram = tuple(tokens[i : i + n])
+                    ids.append(self.ngram_ids.setdefault(ngram, len(self.ngram_ids)))
+            ngrams = self.text_ngrams[text] = np.array(ids, dtype=np.int64)
+        return ngrams
+
+    @staticmethod
+    def _keyed_counts(ngrams: List[np.ndarray], num_ngrams: int):
+        """Unique (pair, n-gram) keys with their counts, and n-grams per pair"""
+        lengths = np.array([len(n) for n in ngrams], dtype=np.int64)
+        if lengths.sum() == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, lengths
+        pairs = np.repeat(np.arange(len(ngrams), dtype=np.int64), lengths)
+        keys, counts = np.unique(
+            pairs * num_ngrams + np.concatenate(ngrams), return_counts=True
+        )
+        return keys, counts, lengths
+
+    def pair_statistics(
+        self, texts: List[str], references: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Matched n-grams and max(tpfp, tpfn) of each aligned pair"""
+        if len(self.ngram_ids) > MAX_NGRAM_IDS:
+            # Memoized n-gram arrays refer to the old ids
+            self.close()
+        text_ngrams = [self._ngrams(text) for text in texts]
+        reference_ngrams = [self._ngrams(reference) for reference in references]
+        num_ngrams = max(len(self.ngram_ids), 1)
+
+        text_keys, text_counts, text_lengths = self._keyed_counts(
+            text_ngrams, num_ngrams
+        )
+        reference_keys, reference_counts, reference_lengths = self._keyed_counts(
+            reference_ngrams, num_ngrams
+        )
+        common, text_idx, reference_idx = np.intersect1d(
+            text_keys, reference_keys, assume_unique=True, return_indices=True
+        )
+        matched = np.minimum(text_counts[text_idx], reference_counts[reference_idx])
+        tp = np.bincount(common // num_ngrams, weights=matched, minlength=len(texts))
+        n_all = np.maximum(text_lengths, reference_lengths)
+        return tp, n_all
+
+    def score(self, text: str) -> float:
+        pass
+
+    def score_pair(self, text: str, reference: str):
+        return self.score_pairs([text], [reference])[0]
+
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        tp, n_all = self.pair_statistics(texts, references)
+        scores = np.zeros(len(texts))
+        np.divide(tp, n_all, out=scores, where=n_all > 0)
+        return scores.tolist()
+
+    def get_corpus_pair_statistics(self, texts: List[str], references: List[str]):
+        tp, n_all = self.pair_statistics(texts, references)
+        return float(tp.sum()), float(n_all.sum())
+
+    def get_config(self) -> str:
+        return (
+            f"nltk={nltk.__version__}|tokenizer={self.tokenizer}"
+            f"|ngrams={self.min_len}-{self.max_len}"
+        )
+
+    def explain_errors(self, text: str):
+        pass
+
+    def close(self):
+        self.ngram_ids = {}
+        self.text_ngrams.clear()
+
+    def get_name(self):
+        return "GLEU"
@@ -1,33 +1,34 @@
+from typing import List
+
 import nltk
-from nltk.tokenize import word_tokenize
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.lexical_engine import get_lexical_engine
 
 
 class JaccardDistanceModule(GECModule):
-    def __init__(self, language="en"):
-        nltk.download("punkt")
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
+    def __init__(self, language="en", tokenizer="nltk"):
         self.language = language
-        self.supports_single_texts = False
-        self.supports_references = True
+        self.tokenizer = tokenizer
+        self.engine = get_lexical_engine(language, tokenizer)
 
     def score(self, text: str) -> float:
         pass
 
     def score_pair(self, text: str, reference: str):
-        text_tokens = set(word_tokenize(text))
-        reference_tokens = set(word_tokenize(reference))
+        return self.score_pairs([text], [reference])[0]
 
-        return (
-            1.0
-            * len(text_tokens & reference_tokens)
-            / len(text_tokens | reference_tokens)
-        )
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        return self.engine.pair_scores(texts, references)["jaccard"].tolist()
 
-    def explain_errors(self, text: str):
-        pass
+    def get_config(self) -> str:
+        return f"nltk={nltk.__version__}|tokenizer={self.tokenizer}"
 
-    def close(self):
+    def explain_errors(self, text: str):
         pass
 
     def get_name(self):
@@ -1,14 +1,25 @@
-import re
+from typing import List
 
 import fasttext
+import numpy as np
 from huggingface_hub import hf_hub_download
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.memo import LRUMemo
+from geceval.modules.model_registry import shared_models
+
+FASTTEXT_REPO_ID = "facebook/fasttext-language-identification"
+FASTTEXT_FILENAME = "model.bin"
 
 
 class LanguageSwitchModule(GECModule):
-    def __init__(self, language="en"):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 0.0
+
+    def __init__(self, language="en", batch_size: int = 1024):
         self.language = language
+        self.batch_size = batch_size
         self.label_to_lang = {
             "__label__eng_Latn": "en",
             "__label__deu_Latn": "de",
@@ -20,24 +31,32 @@ class LanguageSwitchModule(GECModule):
         self.language_label = self.lang_to_label[self.language]
 
         self.model_path = hf_hub_download(
-            repo_id="facebook/fasttext-language-identification", filename="model.bin"
+            repo_id=FASTTEXT_REPO_ID, filename=FASTTEXT_FILENAME
         )
-        self.model = fasttext.load_model(self.model_path)
-        self.supports_single_texts = False
-        self.supports_references = True
+        self.model = shared_models.get(
+            ("fasttext", self.model_path),
+            lambda: fasttext.load_model(self.model_path),
+        )
+        # Target language probabilities of the originals
+        self.text_scores = LRUMemo()
 
     def score(self, text: str) -> float:
-        text = re.sub(r"\n", " ", text)
-        prediction = self.model.predict(text, k=300)
-        language_idx = 0
-        language_labels = prediction[0]
-        language_probabilities = prediction[1]
-
-        for idx in range(len(language_labels)):
-            if language_labels[idx] == self.language_label:
-                language_idx = idx
-                break
-        return language_probabilities[language_idx]
+        return self.predict([text])[0]
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """Probability of the target language for each text"""
+        # fastText predicts one line per text
+        lines = [text.replace("\n", " ") for text in texts]
+        scores = np.zeros(len(lines))
+        for start in range(0, len(lines), self.batch_size):
+            batch = lines[start : start + self.batch_size]
+            # k=-1 returns the full distribution, rows of equal length
+            labels, probabilities = self.model.predict(batch, k=-1)
+            mask = np.asarray(labels) == self.language_label
+            scores[start : start + len(batch)] = (
+                np.asarray(probabilities) * mask
+            ).sum(axis=1)
+        return scores
 
     def score_pair(self, text: str, reference: str):
         text_score = self.score(text)
@@ -45,11 +64,26 @@ class LanguageSwitchModule(GECModule):
 
         return reference_score - text_score
 
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        scores = self.text_scores.get_many(set(texts))
+        missing = [t for t in dict.fromkeys(texts) if t not in scores]
+        if missing:
+            scores.update(zip(missing, self.predict(missing)))
+            for text in missing:
+                self.text_scores[text] = scores[text]
+
+        text_scores = np.array([scores[t] for t in texts])
+        return (self.predict(references) - text_scores).tolist()
+
+    def get_config(self) -> str:
+        # Not model_path, which differs between machines
+        return f"{FASTTEXT_REPO_ID}/{FASTTEXT_FILENAME}"
+
     def explain_errors(self, text: str):
         return False, ""
 
     def close(self):
-        pass
+        self.text_scores.clear()
 
     def get_name(self):
         return "Language switch estimation"
@@ -1,32 +1,195 @@
-from typing import List
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import language_tool_python
+import nltk
+import requests
+from language_tool_python.utils import LanguageToolError
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.lexical_engine import ensure_punkt
+from geceval.modules.memo import LRUMemo
+
+# Failures of a server rather than of a text: the check is retried elsewhere
+RETRIED_ERRORS = (
+    LanguageToolError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
 
 
 class LanguageToolModule(GECModule):
-    def __init__(self, language="en"):
+    supports_single_texts = True
+    supports_references = False
+
+    def __init__(
+        self,
+        language="en",
+        num_servers: int = 1,
+        remote_server: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        incremental: bool = False,
+    ):
+        """
+        incremental checks texts sentence by sentence and caches the matches
+        of every sentence, so a correction only costs checks of the sentences
+        it changed. Rules spanning sentences are then not applied.
+        """
         self.language_map = {"en": "en-US", "de": "de", "it": "it", "sv": "sv"}
+        self.punkt_languages = {
+            "en": "english",
+            "de": "german",
+            "it": "italian",
+            "sv": "swedish",
+        }
         self.set_language(language)
-        self.lt = language_tool_python.LanguageTool(self.language_map[self.language])
-        self.supports_single_texts = True
-        self.supports_references = False
+        # Each instance starts its own local server unless remote_server is set,
+        # in which case they are parallel connections to that server
+        self.servers = [
+            language_tool_python.LanguageTool(
+                self.language_map[self.language], remote_server=remote_server
+            )
+            for _ in range(num_servers)
+        ]
+        self.lt = self.servers[0]
+        self.max_in_flight = max_in_flight or 4 * num_servers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.incremental = incremental
+        self.sentence_splitter = None
+        # Matches of checked texts, shared by score and explain_errors, and
+        # of checked sentences in incremental mode
+        self.text_matches = LRUMemo()
+        self.sentence_matches = LRUMemo()
 
     def score(self, text: str) -> float:
-        suggestions = len(self.lt.check(text))
+        suggestions = len(self.get_matches([text])[0])
         return 1.0 / (1.0 + suggestions)
 
+    def score_texts(self, texts: List[str]) -> List[float]:
+        return [1.0 / (1.0 + len(matches)) for matches in self.get_matches(texts)]
+
     def score_pair(self, texts: List[str], references: List[str]):
         return 0.0
 
+    def get_config(self) -> str:
+        if self.incremental:
+            return f"{self.lt.language_tool_download_version}|incremental"
+        return self.lt.language_tool_download_version
+
     def explain_errors(self, text: str):
-        suggestions = self.lt.check(text)
+        suggestions = self.get_matches([text])[0]
         label = True if len(suggestions) > 0 else False
         return label, ", ".join([str(x) for x in suggestions])
 
+    def get_matches(self, texts: List[str]) -> List[List]:
+        """LanguageTool matches of each text, checking each new text once"""
+        matches = self.text_matches.get_many(set(texts))
+        missing = [t for t in dict.fromkeys(texts) if t not in matches]
+        if missing:
+            if self.incremental:
+                checked = self._check_sentences(missing)
+            else:
+                checked = self._check_all(missing)
+            matches.update(zip(missing, checked))
+            for text in missing:
+                self.text_matches[text] = matches[text]
+        return [matches[text] for text in texts]
+
+    def _split_sentences(self, text: str) -> List[Tuple[int, str]]:
+        if self.sentence_splitter is None:
+            ensure_punkt()
+            self.sentence_splitter = nltk.data.load(
+                f"tokenizers/punkt/{self.punkt_languages[self.language]}.pickle"
+            )
+        return [
+            (start, text[start:end])
+            for start, end in self.sentence_splitter.span_tokenize(text)
+        ]
+
+    def _check_sentences(self, texts: List[str]) -> List[List]:
+        """Matches of texts rebuilt from per-sentence matches, with offsets
+        moved to the position of the sentence in its text"""
+        sentences = [self._split_sentences(text) for text in texts]
+        unique = list(
+            dict.fromkeys(
+                sentence
+                for text_sentences in sentences
+                for _, sentence in text_sentences
+            )
+        )
+        sentence_matches = self.sentence_matches.get_many(unique)
+        unseen = [s for s in unique if s not in sentence_matches]
+        sentence_matches.update(zip(unseen, self._check_all(unseen)))
+        for sentence in unseen:
+            self.sentence_matches[sentence] = sentence_matches[sentence]
+
+        results = []
+        for text_sentences in sentences:
+            matches = []
+            for start, sentence in text_sentences:
+                for match in sentence_matches[sentence]:
+                    if start:
+                        match = copy.copy(match)
+                        match.offset += start
+                    matches.append(match)
+            results.append(matches)
+        return results
+
+    def _check(self, text: str, idle_servers: queue.Queue) -> List:
+        """Check a text on an idle server. A failed server goes to the back of
+        the queue, so the retry runs on another one if there is any."""
+        for attempt in range(self.max_retries + 1):
+            server = idle_servers.get()
+            try:
+                return server.check(text)
+            except RETRIED_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+            finally:
+                idle_servers.put(server)
+            # Back off once every server may have failed this text
+            if attempt + 1 >= len(self.servers):
+                time.sleep(self.retry_delay * 2**attempt)
+
+    def _check_all(self, texts: List[str]) -> List[List]:
+        """Check texts on all servers concurrently, keeping the input order"""
+        idle_servers = queue.Queue()
+        for server in self.servers:
+            idle_servers.put(server)
+        if len(self.servers) == 1:
+            return [self._check(text, idle_servers) for text in texts]
+
+        results = [None] * len(texts)
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+
+        def check(idx, text):
+            try:
+                results[idx] = self._check(text, idle_servers)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=len(self.servers)) as pool:
+            futures = []
+            for idx, text in enumerate(texts):
+                in_flight.acquire()
+                futures.append(pool.submit(check, idx, text))
+            for future in futures:
+                future.result()
+        return results
+
     def close(self):
-        self.lt.close()
+        self.text_matches.clear()
+        self.sentence_matches.clear()
+        for server in self.servers:
+            server.close()
 
     def get_name(self):
         return "Language tool"
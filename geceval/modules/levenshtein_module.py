@@ -1,20 +1,84 @@
-from Levenshtein import distance
+from typing import Dict, List
+
+import numpy as np
+from rapidfuzz.distance import Levenshtein
+from rapidfuzz.process import cpdist
 
 from geceval.modules.gec_module import GECModule
 
+EDIT_OPERATIONS = ("insert", "delete", "replace")
+
 
 class LevenshteinModule(GECModule):
-    def __init__(self, language="en"):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
+    def __init__(self, language="en", variant: str = "inverse", workers: int = -1):
+        """
+        variant "inverse" scores 1 / (1 + distance), "normalized" scores
+        1 - distance / max(len(text), len(reference))
+        """
+        if variant not in ("inverse", "normalized"):
+            raise ValueError(f"Unknown Levenshtein variant: {variant}")
         self.language = language
-        self.supports_single_texts = False
-        self.supports_references = True
+        self.variant = variant
+        self.workers = workers
 
     def score(self, text: str) -> float:
         pass
 
     def score_pair(self, text: str, reference: str):
-        texts_distance = distance(text, reference)
-        return 1.0 / (1.0 + texts_distance)
+        return float(self.bulk_scores([text], [reference])[self.variant][0])
+
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        return self.bulk_scores(texts, references)[self.variant].tolist()
+
+    def bulk_distances(self, texts: List[str], references: List[str]) -> np.ndarray:
+        """Paired distances computed in native code on all cores"""
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+        return cpdist(
+            texts,
+            references,
+            scorer=Levenshtein.distance,
+            dtype=np.int64,
+            workers=self.workers,
+        )
+
+    def bulk_scores(
+        self, texts: List[str], references: List[str], edit_operations=False
+    ) -> Dict[str, np.ndarray]:
+        """
+        All variants from one bulk pass: distance, inverse, normalized and,
+        optionally, per-pair counts of insert/delete/replace operations
+        turning text into reference
+        """
+        distances = self.bulk_distances(texts, references)
+        max_lengths = np.fromiter(
+            (max(len(t), len(r)) for t, r in zip(texts, references)),
+            dtype=np.int64,
+            count=len(distances),
+        )
+        scores = {
+            "distance": distances,
+            "inverse": 1.0 / (1.0 + distances),
+            "normalized": 1.0 - distances / np.maximum(max_lengths, 1),
+        }
+
+        if edit_operations:
+            counts = np.zeros((len(distances), len(EDIT_OPERATIONS)), dtype=np.int64)
+            # Identical pairs need no editops call
+            for idx in np.flatnonzero(distances):
+                operations = Levenshtein.editops(texts[idx], references[idx])
+                for tag, _, _ in operations:
+                    counts[idx, EDIT_OPERATIONS.index(tag)] += 1
+            for column, operation in enumerate(EDIT_OPERATIONS):
+                scores[operation] = counts[:, column]
+        return scores
+
+    def get_config(self) -> str:
+        return self.variant
 
     def explain_errors(self, text: str):
         pass
@@ -23,4 +87,6 @@ class LevenshteinModule(GECModule):
         pass
 
     def get_name(self):
+        if self.variant == "normalized":
+            return "Normalized Levenshtein similarity"
         return "Levensthein distance"
@@ -0,0 +1,120 @@
+import re
+from typing import Dict, List
+
+import nltk
+import numpy as np
+from nltk.tokenize import word_tokenize
+
+from geceval.modules.memo import LRUMemo
+from geceval.modules.model_registry import shared_models
+
+# nltk's Treebank word rules (NLTKWordTokenizer) as one findall, without the
+# per-sentence punkt pass of word_tokenize: clitics and "n't" are split off,
+# double quotes become `` and '', other punctuation marks are separate tokens
+# unless inside a word ("dell'anno", "www.example.com", "10:30", "a/b").
+# Periods differ: one before whitespace is always split off, which matches
+# word_tokenize at sentence ends but not after abbreviations ("Mr." -> "Mr",
+# "."; "U.S." -> "U.S", "."), where word_tokenize keeps the period.
+SPLIT_CHARS = r";@#$%&?!()\[\]{}<>*«»\"`"
+WORD_CHAR = rf"[^\s{SPLIT_CHARS}.,:']"
+CLITIC = r"(?:s|m|d|ll|re|ve)\b"
+WORD_TOKEN_RE = re.compile(
+    r"``|''"
+    r"|\w+(?=n't\b)"
+    r"|n't\b"
+    rf"|'{CLITIC}"
+    r"|\.\.\."
+    r"|--"
+    # A word may contain periods before another word character, commas and
+    # colons before a digit and apostrophes not starting a clitic
+    rf"|'?{WORD_CHAR}(?:{WORD_CHAR}|\.(?={WORD_CHAR})|[,:](?=\d)"
+    rf"|'(?!{CLITIC}|t\b)(?={WORD_CHAR}))*"
+    r"|[^\w\s]",
+    re.IGNORECASE,
+)
+OPENING_QUOTE_RE = re.compile(r'(^|[\s(\[{<])"')
+
+
+def regex_tokenize(text: str) -> List[str]:
+    text = OPENING_QUOTE_RE.sub(r"\1 `` ", text).replace('"', " '' ")
+    return WORD_TOKEN_RE.findall(text)
+
+
+def ensure_punkt():
+    """Downloads the punkt models unless they are already installed"""
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        nltk.download("punkt")
+
+
+class LexicalEngine:
+    """
+    Shared lexical pass of one language: each unique text is tokenized once
+    for all modules using the engine, and Jaccard and token count distance
+    are computed together per pair
+    """
+
+    def __init__(self, language: str = "en", tokenizer: str = "nltk"):
+        if tokenizer not in ("nltk", "regex"):
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        self.language = language
+        self.tokenizer = tokenizer
+        self.tokenize = None
+
+        # Bounded, as a service keeps the engine for its whole lifetime
+        self.tokens = LRUMemo()
+        self.pair_metrics = LRUMemo()
+
+    def get_tokens(self, text: str) -> List[str]:
+        tokens = self.tokens.get(text)
+        if tokens is None:
+            if self.tokenize is None:
+                self._load_tokenizer()
+            tokens = self.tokens[text] = self.tokenize(text)
+        return tokens
+
+    def _load_tokenizer(self):
+        if self.tokenizer == "nltk":
+            ensure_punkt()
+            self.tokenize = word_tokenize
+        else:
+            self.tokenize = regex_tokenize
+
+    def _pair_metrics(self, text: str, reference: str):
+        text_tokens = self.get_tokens(text)
+        reference_tokens = self.get_tokens(reference)
+
+        text_set = set(text_tokens)
+        reference_set = set(reference_tokens)
+        jaccard = 1.0 * len(text_set & reference_set) / len(text_set | reference_set)
+
+        text_count = len(text_tokens)
+        reference_count = len(reference_tokens)
+        max_len = text_count if text_count > reference_count else reference_count
+        token_count = 1 - (abs(text_count - reference_count) / max_len)
+        return jaccard, token_count
+
+    def pair_scores(
+        self, texts: List[str], references: List[str]
+    ) -> Dict[str, np.ndarray]:
+        """Jaccard and token count distance of aligned text/reference lists"""
+        scores = np.zeros((len(texts), 2))
+        for idx, pair in enumerate(zip(texts, references)):
+            metrics = self.pair_metrics.get(pair)
+            if metrics is None:
+                metrics = self.pair_metrics[pair] = self._pair_metrics(*pair)
+            scores[idx] = metrics
+        return {"jaccard": scores[:, 0], "token_count": scores[:, 1]}
+
+    def clear(self):
+        self.tokens.clear()
+        self.pair_metrics.clear()
+
+
+def get_lexical_engine(language: str, tokenizer: str = "nltk") -> LexicalEngine:
+    """The engine shared by all lexical modules of a language"""
+    return shared_models.get(
+        ("lexical_engine", language, tokenizer),
+        lambda: LexicalEngine(language, tokenizer),
+    )
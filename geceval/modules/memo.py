@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional
+
+# Default bound of the per-text memos of the modules, so a long-running
+# process (e.g. service.py) does not grow with every text it has seen
+MAX_MEMO_ITEMS = 100_000
+
+
+class LRUMemo:
+    """
+    Dictionary-like memo keeping the max_items most recently used entries,
+    all of them if max_items is None. Thread-safe, as the service scores the
+    modules sharing a memo (e.g. through the lexical engine) on separate
+    threads.
+    """
+
+    def __init__(self, max_items: Optional[int] = MAX_MEMO_ITEMS):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def __getitem__(self, key: Hashable):
+        with self._lock:
+            value = self._items[key]
+            self._items.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if self.max_items is not None:
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict:
+        """The memoized entries of keys, looked up atomically"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    found[key] = self._items[key]
+        return found
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
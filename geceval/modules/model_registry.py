@@ -0,0 +1,42 @@
+import threading
+from typing import Callable, Hashable
+
+
+class ModelRegistry:
+    """
+    Lazily constructed backends shared between GECModule instances, so
+    language-agnostic weights are loaded once per process, also when modules
+    are constructed from several threads
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        # One lock per key, so different backends can load concurrently
+        self._key_locks = {}
+
+    def get(self, key: Hashable, factory: Callable):
+        """Return the backend stored under key, constructing it on first use"""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._models:
+                self._models[key] = factory()
+            return self._models[key]
+
+    def clear(self):
+        with self._lock:
+            self._models = {}
+            self._key_locks = {}
+
+    def __contains__(self, key: Hashable):
+        return key in self._models
+
+    def __len__(self):
+        return len(self._models)
+
+
+shared_models = ModelRegistry()
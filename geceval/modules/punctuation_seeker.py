@@ -4,12 +4,13 @@ from geceval.modules.gec_module import GECModule
 
 
 class PunctuationSeekerModule(GECModule):
+    supports_single_texts = True
+    supports_references = False
+
     def __init__(self, language="en"):
         self.set_language(language)
         self.major_punctuation_marks = ".,!?"
         self.minor_punctuation_marks = "`'\"-;"
-        self.supports_single_texts = True
-        self.supports_references = False
 
     def score(self, text: str) -> float:
         for mark in self.major_punctuation_marks:
@@ -23,6 +24,9 @@ class PunctuationSeekerModule(GECModule):
     def score_pair(self, texts: List[str], references: List[str]):
         return 0.0
 
+    def get_config(self) -> str:
+        return self.major_punctuation_marks + self.minor_punctuation_marks
+
     def explain_errors(self, text: str):
         if self.score(text) == 0:
             return (
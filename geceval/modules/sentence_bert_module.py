@@ -1,20 +1,35 @@
+from typing import List
+
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer, util
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.memo import LRUMemo
+from geceval.modules.model_registry import shared_models
 
 
 class SentenceBertModule(GECModule):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
     def __init__(
         self,
         language: str,
         model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        batch_size: int = 256,
     ):
-        self.supports_single_texts = False
-        self.supports_references = True
+        self.model_name = model_name
+        self.batch_size = batch_size
         self.language = language
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = SentenceTransformer(model_name, device=self.device)
+        self.model = shared_models.get(
+            ("sentence_bert", model_name, self.device),
+            lambda: SentenceTransformer(model_name, device=self.device),
+        )
+        # Normalized embeddings of the originals, reused by every slice
+        self.text_embeddings = LRUMemo()
 
     def score(self, text: str) -> float:
         pass
@@ -24,13 +39,39 @@ class SentenceBertModule(GECModule):
         cos_sim = util.cos_sim(e1, e2)
         return cos_sim.item()
 
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        if not texts:
+            return []
+        embeddings = self.text_embeddings.get_many(set(texts))
+        missing = [t for t in dict.fromkeys(texts) if t not in embeddings]
+        if missing:
+            embeddings.update(zip(missing, self._encode(missing)))
+            for text in missing:
+                self.text_embeddings[text] = embeddings[text]
+
+        text_embeddings = np.stack([embeddings[t] for t in texts])
+        reference_embeddings = self._encode(references)
+        return np.einsum("ij,ij->i", text_embeddings, reference_embeddings).tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def get_config(self) -> str:
+        return self.model_name
+
     def explain_errors(self, text: str):
         pass
 
     def close(self):
-        del self.model
-        if self.device == "cuda":
-            torch.cuda.empty_cache()
+        self.text_embeddings.clear()
+        # The model itself stays in shared_models for other modules
+        self.model = None
 
     def get_name(self):
         return "Sentence Bert"
@@ -1,31 +1,38 @@
-from typing import List
+from typing import List, Optional
 
-from spellchecker import SpellChecker
+import spellchecker
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.spell_dictionary import get_spell_vocabulary, split_words
 
 
 class SpellcheckerModule(GECModule):
-    def __init__(self, language="en"):
+    supports_single_texts = True
+    supports_references = False
+
+    def __init__(self, language="en", dictionary_dir: Optional[str] = None):
         self.set_language(language)
-        self.spellchecker = SpellChecker(language=self.language, case_sensitive=True)
-        self.supports_single_texts = True
-        self.supports_references = False
+        self.vocabulary = get_spell_vocabulary(self.language, dictionary_dir)
 
     def score(self, text: str) -> float:
-        tokens = self.spellchecker.split_words(text)
-        misspelled = self.spellchecker.unknown(tokens)
+        misspelled = self.vocabulary.unknown(split_words(text))
         return 1.0 / (1.0 + len(misspelled))
 
+    def score_texts(self, texts: List[str]) -> List[float]:
+        self.vocabulary.resolve(word for text in texts for word in split_words(text))
+        return [self.score(text) for text in texts]
+
     def score_pair(self, texts: List[str], references: List[str]):
         return 0.0
 
+    def get_config(self) -> str:
+        return f"pyspellchecker={spellchecker.__version__}"
+
     def explain_errors(self, text: str):
-        tokens = self.spellchecker.split_words(text)
-        misspelled = self.spellchecker.unknown(tokens)
+        misspelled = self.vocabulary.unknown(split_words(text))
         label = True if len(misspelled) > 0 else False
         return label, ", ".join(
-            [f"{error}->{self.spellchecker.correction(error)}" for error in misspelled]
+            [f"{error}->{self.vocabulary.correction(error)}" for error in misspelled]
         )
 
     def get_name(self):
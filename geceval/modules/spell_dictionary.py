@@ -0,0 +1,181 @@
+import argparse
+import json
+import re
+import string
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import spellchecker
+from spellchecker import SpellChecker
+
+from geceval.modules.memo import LRUMemo
+from geceval.modules.model_registry import shared_models
+
+FORMAT_VERSION = 1
+
+# Same split as pyspellchecker's default tokenizer
+SPELL_WORD_RE = re.compile(r"(\w[\w']*\w|\w)")
+
+
+def split_words(text: str) -> List[str]:
+    return SPELL_WORD_RE.findall(text)
+
+
+def get_spellchecker(language: str) -> SpellChecker:
+    """pyspellchecker instance of a language, decompressed once per process"""
+    return shared_models.get(
+        ("spellchecker", language),
+        lambda: SpellChecker(language=language, case_sensitive=True),
+    )
+
+
+def compile_dictionary(language: str, path: str):
+    """
+    Store the pyspellchecker word list of a language as a sorted unicode array
+    that SpellDictionary memory-maps instead of decompressing the JSON again
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    frequency = get_spellchecker(language).word_frequency
+    words = np.array(sorted(frequency.dictionary.keys()))
+    np.save(path / "words.npy", words)
+    meta = {
+        "version": FORMAT_VERSION,
+        "language": language,
+        "pyspellchecker": spellchecker.__version__,
+        "longest_word_length": frequency.longest_word_length,
+    }
+    with open(path / "meta.json", "w") as out:
+        json.dump(meta, out)
+
+
+class SpellDictionary:
+    """Read-only, memory-mapped word list written by compile_dictionary"""
+
+    def __init__(self, path: str):
+        path = Path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {meta['version']}")
+        self.language = meta["language"]
+        self.longest_word_length = meta["longest_word_length"]
+        self.words = np.load(path / "words.npy", mmap_mode="r")
+
+    def contains(self, words: List[str]) -> np.ndarray:
+        """Membership of each word, with one binary search over the array"""
+        if not words:
+            return np.zeros(0, dtype=bool)
+        queries = np.array(words)
+        positions = np.searchsorted(self.words, queries)
+        found = np.zeros(len(words), dtype=bool)
+        in_range = positions < len(self.words)
+        found[in_range] = self.words[positions[in_range]] == queries[in_range]
+        return found
+
+
+class SpellVocabulary:
+    """
+    Known/unknown status and corrections of the words of one language,
+    memoized for the most recent words scored in this process
+    """
+
+    def __init__(self, language: str, dictionary_dir: Optional[str] = None):
+        self.language = language
+        self.dictionary = None
+        if dictionary_dir is not None:
+            path = Path(dictionary_dir) / language
+            if not (path / "meta.json").is_file():
+                compile_dictionary(language, path)
+            self.dictionary = SpellDictionary(path)
+            self.longest_word_length = self.dictionary.longest_word_length
+        else:
+            frequency = get_spellchecker(language).word_frequency
+            self.longest_word_length = frequency.longest_word_length
+
+        self.unknown_words = LRUMemo()
+        self.corrections = LRUMemo()
+
+    def _should_check(self, word: str) -> bool:
+        # SpellChecker._check_if_should_check
+        if len(word) == 1 and word in string.punctuation:
+            return False
+        if len(word) > self.longest_word_length + 3:
+            return False
+        if word.lower() == "nan":
+            return True
+        try:
+            float(word)
+            return False
+        except ValueError:
+            pass
+        return True
+
+    def resolve(self, words: Iterable[str]) -> Dict[str, bool]:
+        """Unknown status of the words, looking up all new ones at once"""
+        statuses = {}
+        new_words = []
+        for word in set(words):
+            status = self.unknown_words.get(word)
+            if status is None:
+                new_words.append(word)
+            else:
+                statuses[word] = status
+        if not new_words:
+            return statuses
+        checked = [w for w in new_words if self._should_check(w)]
+        lowered = [w.lower() for w in checked]
+        if self.dictionary is not None:
+            known = self.dictionary.contains(lowered).tolist()
+        else:
+            dictionary = get_spellchecker(self.language).word_frequency.dictionary
+            known = [w in dictionary for w in lowered]
+
+        for word in new_words:
+            statuses[word] = False
+        for word, is_known in zip(checked, known):
+            statuses[word] = not is_known
+        for word in new_words:
+            self.unknown_words[word] = statuses[word]
+        return statuses
+
+    def unknown(self, words: List[str]) -> Set[str]:
+        """Lowercased unknown words, as SpellChecker.unknown returns them"""
+        statuses = self.resolve(words)
+        return {w.lower() for w in words if statuses[w]}
+
+    def correction(self, word: str) -> Optional[str]:
+        # A correction may be None, so membership is checked in one lookup
+        corrections = self.corrections.get_many([word])
+        if word in corrections:
+            return corrections[word]
+        correction = get_spellchecker(self.language).correction(word)
+        self.corrections[word] = correction
+        return correction
+
+    def clear(self):
+        self.unknown_words.clear()
+        self.corrections.clear()
+
+
+def get_spell_vocabulary(
+    language: str, dictionary_dir: Optional[str] = None
+) -> SpellVocabulary:
+    """The vocabulary memo shared by all spell checker modules of a language"""
+    return shared_models.get(
+        ("spell_vocabulary", language, dictionary_dir),
+        lambda: SpellVocabulary(language, dictionary_dir),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompile memory-mapped pyspellchecker dictionaries"
+    )
+    parser.add_argument("output_dir", help="One subdirectory per language is written")
+    parser.add_argument("languages", nargs="+", help="Language codes, e.g. en de")
+    args = parser.parse_args()
+
+    for language in args.languages:
+        compile_dictionary(language, Path(args.output_dir) / language)
@@ -0,0 +1,119 @@
+import zlib
+from typing import List
+
+import numpy as np
+
+from geceval.modules.gec_module import GECModule
+
+
+class HashedEmbeddingModule(GECModule):
+    """
+    Offline stand-in for the embedding based modules (BERTScore, Sentence
+    Bert, BLEURT): cosine similarity of hashed character trigram counts
+    """
+
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
+    def __init__(self, language="en", name="Hashed embedding", dim=256):
+        self.set_language(language)
+        self.name = name
+        self.dim = dim
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dim))
+        for idx, text in enumerate(texts):
+            padded = f"  {text} "
+            buckets = [
+                zlib.crc32(padded[i : i + 3].encode()) % self.dim
+                for i in range(len(padded) - 2)
+            ]
+            embeddings[idx] = np.bincount(buckets, minlength=self.dim)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def score(self, text: str):
+        return 0.0
+
+    def score_pair(self, text: str, reference: str) -> float:
+        return self.score_pairs([text], [reference])[0]
+
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        similarity = np.einsum("ij,ij->i", self._embed(texts), self._embed(references))
+        return similarity.tolist()
+
+    def explain_errors(self, text: str):
+        return False, ""
+
+    def get_name(self):
+        return self.name
+
+
+class ScriptSwitchModule(GECModule):
+    """
+    Offline stand-in for LanguageSwitchModule: change in the share of non-ASCII
+    letters between the original and the correction
+    """
+
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 0.0
+
+    def __init__(self, language="en", name="Script switch"):
+        self.set_language(language)
+        self.name = name
+
+    def score(self, text: str) -> float:
+        letters = [c for c in text if c.isalpha()]
+        if not letters:
+            return 0.0
+        return sum(1 for c in letters if not c.isascii()) / len(letters)
+
+    def score_pair(self, text: str, reference: str) -> float:
+        return abs(self.score(text) - self.score(reference))
+
+    def explain_errors(self, text: str):
+        return False, ""
+
+    def get_name(self):
+        return self.name
+
+
+class RuleCountModule(GECModule):
+    """
+    Offline stand-in for LanguageToolModule: a few surface rules counted per
+    text, scored like the LanguageTool error count
+    """
+
+    supports_single_texts = True
+    supports_references = False
+
+    def __init__(self, language="en", name="Rule count"):
+        self.set_language(language)
+        self.name = name
+
+    def _errors(self, text: str) -> List[str]:
+        errors = []
+        if "  " in text:
+            errors.append("double space")
+        if " ," in text or " ." in text:
+            errors.append("space before punctuation")
+        if text[:1].islower():
+            errors.append("lowercase sentence start")
+        if text and text.rstrip()[-1:] not in ".!?":
+            errors.append("missing final punctuation")
+        return errors
+
+    def score(self, text: str) -> float:
+        return 1.0 / (1.0 + len(self._errors(text)))
+
+    def score_pair(self, text: str, reference: str):
+        return 0.0
+
+    def explain_errors(self, text: str):
+        errors = self._errors(text)
+        return len(errors) > 0, ", ".join(errors)
+
+    def get_name(self):
+        return self.name
@@ -1,32 +1,34 @@
-import math
+from typing import List
 
 import nltk
-from nltk.tokenize import word_tokenize
 
 from geceval.modules.gec_module import GECModule
+from geceval.modules.lexical_engine import get_lexical_engine
 
 
 class TokenCountDistanceModule(GECModule):
-    def __init__(self, language="en"):
+    supports_single_texts = False
+    supports_references = True
+    identity_score = 1.0
+
+    def __init__(self, language="en", tokenizer="nltk"):
         self.language = language
-        self.supports_single_texts = False
-        self.supports_references = True
-        nltk.download("punkt")
+        self.tokenizer = tokenizer
+        self.engine = get_lexical_engine(language, tokenizer)
 
     def score(self, text: str) -> float:
         pass
 
     def score_pair(self, text: str, reference: str):
-        text_tokens = len(word_tokenize(text))
-        reference_tokens = len(word_tokenize(reference))
-        max_len = text_tokens if text_tokens > reference_tokens else reference_tokens
+        return self.score_pairs([text], [reference])[0]
 
-        return 1 - (math.fabs(text_tokens - reference_tokens) / max_len)
+    def score_pairs(self, texts: List[str], references: List[str]) -> List[float]:
+        return self.engine.pair_scores(texts, references)["token_count"].tolist()
 
-    def explain_errors(self, text: str):
-        pass
+    def get_config(self) -> str:
+        return f"nltk={nltk.__version__}|tokenizer={self.tokenizer}"
 
-    def close(self):
+    def explain_errors(self, text: str):
         pass
 
     def get_name(self):
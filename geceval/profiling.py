@@ -0,0 +1,125 @@
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+RSS_SCALE = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+def _null_span():
+    # A fresh throwaway dict per block, so blocks can fill in arguments
+    # unconditionally without them outliving the block
+    return contextlib.nullcontext({})
+
+
+class Profiler:
+    """
+    Opt-in recorder of timed spans, saved in the Chrome trace event format
+    (chrome://tracing, Perfetto). Every span records wall and CPU time, the
+    number of items processed and the peak RSS the process has reached so
+    far (ru_maxrss), which is not specific to the span.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+
+    def enable(self):
+        self.enabled = True
+
+    @contextlib.contextmanager
+    def _span(self, name: str, args: Dict):
+        start = time.perf_counter_ns()
+        cpu_start = time.process_time_ns()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter_ns()
+            args["cpu_ms"] = (time.process_time_ns() - cpu_start) / 1e6
+            args["process_peak_rss_mb"] = (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_SCALE
+            )
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def span(self, name: str, **args):
+        """
+        Time a block; language, module and items are grouped in the summary.
+        The block gets the span's arguments, to add those it only learns itself
+        """
+        if not self.enabled:
+            return _null_span()
+        return self._span(name, args)
+
+    def drain(self) -> List[Dict]:
+        """Take the recorded events, e.g. to send them from a pool worker"""
+        events, self.events = self.events, []
+        return events
+
+    def extend(self, events: List[Dict]):
+        self.events.extend(events)
+
+    def summary(self) -> List[Dict]:
+        """Totals per (span name, language, module)"""
+        totals = defaultdict(
+            lambda: {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "items": 0}
+        )
+        # Highest process peak seen when a span of the key ended
+        peak_rss = defaultdict(float)
+        for event in self.events:
+            args = event["args"]
+            key = (event["name"], args.get("language"), args.get("module"))
+            total = totals[key]
+            total["calls"] += 1
+            total["wall_ms"] += event["dur"] / 1000
+            total["cpu_ms"] += args["cpu_ms"]
+            total["items"] += args.get("items", 0)
+            peak_rss[key] = max(peak_rss[key], args["process_peak_rss_mb"])
+
+        rows = []
+        for (name, language, module), total in totals.items():
+            rows.append(
+                {
+                    "name": name,
+                    "language": language,
+                    "module": module,
+                    **total,
+                    "process_peak_rss_mb": peak_rss[(name, language, module)],
+                }
+            )
+        rows.sort(key=lambda row: row["wall_ms"], reverse=True)
+        return rows
+
+    def save(self, path: str):
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"summary": self.summary()},
+        }
+        with open(path, "w") as out:
+            json.dump(trace, out)
+
+
+profiler = Profiler()
+
+
+def span(name: str, **args):
+    """Span of the process-wide profiler, a no-op when it is disabled"""
+    if not profiler.enabled:
+        return _null_span()
+    return profiler._span(name, args)
@@ -0,0 +1,110 @@
+import hashlib
+import math
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SQLITE_MAX_VARIABLES = 900
+
+
+def text_digest(text: str, reference: Optional[str] = None) -> bytes:
+    """Content address of a text, or of a text/reference pair"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+    if reference is not None:
+        digest.update(b"\x00")
+        digest.update(reference.encode("utf-8"))
+    return digest.digest()
+
+
+class ScoreCache:
+    """
+    Persistent SQLite store of metric scores keyed by a namespace (module
+    name, configuration and language) and the digest of the scored content
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Shared by the module threads of the evaluation service, see lock
+        self.connection = sqlite3.connect(path, timeout=60.0, check_same_thread=False)
+        self.lock = threading.Lock()
+        # WAL lets several worker processes read while one of them writes
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "namespace TEXT NOT NULL, digest BLOB NOT NULL, score REAL NOT NULL, "
+            "PRIMARY KEY (namespace, digest)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def get_many(self, namespace: str, digests: Iterable[bytes]) -> Dict[bytes, float]:
+        digests = list(digests)
+        result = {}
+        for start in range(0, len(digests), SQLITE_MAX_VARIABLES):
+            chunk = digests[start : start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(
+                    f"SELECT digest, score FROM scores "
+                    f"WHERE namespace = ? AND digest IN ({placeholders})",
+                    [namespace, *chunk],
+                ).fetchall()
+            result.update(rows)
+        return result
+
+    def put_many(self, namespace: str, items: Iterable[Tuple[bytes, float]]):
+        """Store scores, except NaN, infinite or None ones, which are
+        recomputed every time rather than stored (sqlite binds NaN as NULL)"""
+        rows = [
+            (namespace, digest, float(score))
+            for digest, score in items
+            if score is not None and math.isfinite(score)
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO scores (namespace, digest, score) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+def score_with_cache(
+    cache: ScoreCache,
+    namespace: str,
+    texts: List[str],
+    references: Optional[List[str]],
+    compute,
+) -> List[float]:
+    """
+    Look all items up in one bulk query, compute only the unique missing ones
+    with compute(texts, references) and store them back
+    """
+    if references is None:
+        digests = [text_digest(text) for text in texts]
+    else:
+        digests = [text_digest(t, r) for t, r in zip(texts, references)]
+    scores = cache.get_many(namespace, set(digests))
+
+    missing = {}
+    for idx, digest in enumerate(digests):
+        if digest not in scores and digest not in missing:
+            missing[digest] = idx
+
+    if missing:
+        missing_texts = [texts[idx] for idx in missing.values()]
+        if references is None:
+            computed = compute(missing_texts)
+        else:
+            computed = compute(
+                missing_texts, [references[idx] for idx in missing.values()]
+            )
+        computed = dict(zip(missing.keys(), computed))
+        cache.put_many(namespace, computed.items())
+        scores.update(computed)
+
+    return [scores[digest] for digest in digests]
@@ -0,0 +1,282 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from geceval.columnar_store import StringColumn, StringColumnWriter
+from geceval.correction_index import LanguageIndex
+
+FORMAT_VERSION = 1
+ORIGINAL = -1
+ROW_COLUMNS = {
+    "row_language": np.int16,
+    "row_module": np.int16,
+    "row_prompt": np.int16,
+    "row_model": np.int16,
+    "row_entry": np.int64,
+    "row_score": np.float64,
+}
+GROUP_KEYS = ("language", "module", "prompt_id", "model_name")
+
+
+class ScoreStoreWriter:
+    """
+    Collects per-sentence scores of evaluation results and saves them as a
+    directory of .npy columns. Originals are stored with prompt and model
+    code ORIGINAL.
+    """
+
+    def __init__(self):
+        self.dictionaries = {
+            "languages": {},
+            "modules": {},
+            "prompt_ids": {},
+            "model_names": {},
+            "labels": {},
+        }
+        self.module_names = {}
+        self.entry_offsets = {}
+        self.entry_ids = StringColumnWriter()
+        self.entry_language = []
+        self.entry_label = []
+        self.rows = {name: [] for name in ROW_COLUMNS}
+        # Additional JSON-serialisable metadata, e.g. of an evaluation shard
+        self.extra_meta = {}
+
+    def _encode(self, dictionary: str, value) -> int:
+        values = self.dictionaries[dictionary]
+        return values.setdefault(value, len(values))
+
+    def add_language(self, language_index: LanguageIndex):
+        if language_index.language in self.entry_offsets:
+            return
+        self.entry_offsets[language_index.language] = len(self.entry_language)
+        language_code = self._encode("languages", language_index.language)
+        for entry_id, label in zip(
+            language_index.entry_ids, language_index.marked_correct
+        ):
+            self.entry_ids.append(entry_id)
+            self.entry_language.append(language_code)
+            self.entry_label.append(self._encode("labels", label))
+
+    def _add_rows(self, language, module, prompt_code, model_code, positions, scores):
+        n = len(scores)
+        self.rows["row_language"].append(
+            np.full(n, self._encode("languages", language))
+        )
+        self.rows["row_module"].append(np.full(n, self._encode("modules", module)))
+        self.rows["row_prompt"].append(np.full(n, prompt_code))
+        self.rows["row_model"].append(np.full(n, model_code))
+        self.rows["row_entry"].append(
+            self.entry_offsets[language] + np.asarray(positions, dtype=np.int64)
+        )
+        self.rows["row_score"].append(np.asarray(scores, dtype=np.float64))
+
+    def add_result(
+        self,
+        result,
+        language_index: LanguageIndex,
+        entry_positions: Optional[np.ndarray] = None,
+    ):
+        """
+        Add the per-sentence scores of an evaluator ModuleResult. A result of a
+        LanguageIndex.subset is stored at the positions of its entries in the
+        full index, given as entry_positions, which must be added first.
+        """
+        self.add_language(language_index)
+        module = result.module.name
+        self.module_names[module] = result.module_name
+        if entry_positions is None:
+            entry_positions = np.arange(len(language_index), dtype=np.int64)
+
+        if result.original_scores:
+            self._add_rows(
+                result.language,
+                module,
+                ORIGINAL,
+                ORIGINAL,
+                entry_positions[: len(result.original_scores)],
+                result.original_scores,
+            )
+        for (prompt_id, model_name), scores in result.corrected_scores.items():
+            self._add_rows(
+                result.language,
+                module,
+                self._encode("prompt_ids", prompt_id),
+                self._encode("model_names", model_name),
+                entry_positions[
+                    language_index.get_slice(prompt_id, model_name).positions
+                ],
+                scores,
+            )
+
+    def save(self, path: str):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        for name, dtype in ROW_COLUMNS.items():
+            chunks = self.rows[name]
+            column = np.concatenate(chunks) if chunks else np.zeros(0)
+            np.save(path / f"{name}.npy", column.astype(dtype))
+        np.save(path / "entry_language.npy", np.asarray(self.entry_language, np.int16))
+        np.save(path / "entry_label.npy", np.asarray(self.entry_label, np.int16))
+        self.entry_ids.save(path, "entry_ids")
+
+        meta = {"version": FORMAT_VERSION, "module_names": self.module_names}
+        meta.update(self.extra_meta)
+        meta.update({name: list(values) for name, values in self.dictionaries.items()})
+        with open(path / "meta.json", "w") as out:
+            json.dump(meta, out, ensure_ascii=False)
+
+
+class ScoreStore:
+    """
+    Memory-mapped (language, module, prompt_id, model_name, entry) -> score
+    table with filters, aggregates and top-k queries. Filters take a value or
+    a list of values; modules are GECModules names, e.g. "BERTSCORE".
+    """
+
+    def __init__(self, path: str):
+        path = Path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {meta['version']}")
+
+        self.languages = meta["languages"]
+        self.modules = meta["modules"]
+        self.prompt_ids = meta["prompt_ids"]
+        self.model_names = meta["model_names"]
+        self.labels = meta["labels"]
+        self.module_names = meta["module_names"]
+        self.meta = meta
+
+        for name in list(ROW_COLUMNS) + ["entry_language", "entry_label"]:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+        self.entry_ids = StringColumn(path, "entry_ids")
+
+        self._columns = {
+            "language": (self.row_language, self.languages),
+            "module": (self.row_module, self.modules),
+            "prompt_id": (self.row_prompt, self.prompt_ids),
+            "model_name": (self.row_model, self.model_names),
+        }
+
+    def __len__(self):
+        return len(self.row_score)
+
+    def _isin(self, column, dictionary: List, values) -> np.ndarray:
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        codes = [dictionary.index(v) for v in values if v in dictionary]
+        return np.isin(column, codes)
+
+    def select(
+        self,
+        language=None,
+        module=None,
+        prompt_id=None,
+        model_name=None,
+        marked_correct=None,
+        originals: bool = False,
+    ) -> np.ndarray:
+        """Indices of the rows matching all given filters. Originals are only
+        selected with originals=True, corrections only without it."""
+        mask = (self.row_model == ORIGINAL) == originals
+        for key, values in [
+            ("language", language),
+            ("module", module),
+            ("prompt_id", prompt_id),
+            ("model_name", model_name),
+        ]:
+            if values is not None:
+                mask &= self._isin(*self._columns[key], values)
+        if marked_correct is not None:
+            mask &= self._isin(
+                self.entry_label[self.row_entry], self.labels, marked_correct
+            )
+        return np.flatnonzero(mask)
+
+    def scores(self, **filters) -> np.ndarray:
+        return np.asarray(self.row_score[self.select(**filters)])
+
+    def aggregate(
+        self, group_by: Sequence[str] = ("model_name",), stat: str = "mean", **filters
+    ) -> Dict[tuple, float]:
+        """
+        Aggregate scores per group, group_by being a subset of language, module,
+        prompt_id and model_name; stat is one of mean, sum, count, min, max, std
+        """
+        rows = self.select(**filters)
+        if len(rows) == 0:
+            return {}
+
+        codes = [self._columns[key][0][rows].astype(np.int64) for key in group_by]
+        if codes:
+            keys, inverse = np.unique(
+                np.stack(codes, axis=1), axis=0, return_inverse=True
+            )
+            inverse = inverse.reshape(-1)
+        else:
+            keys, inverse = np.zeros((1, 0), np.int64), np.zeros(len(rows), np.int64)
+
+        values = np.asarray(self.row_score[rows])
+        counts = np.bincount(inverse, minlength=len(keys))
+        sums = np.bincount(inverse, weights=values, minlength=len(keys))
+        if stat == "mean":
+            result = sums / counts
+        elif stat == "sum":
+            result = sums
+        elif stat == "count":
+            result = counts
+        elif stat == "std":
+            squares = np.bincount(inverse, weights=values**2, minlength=len(keys))
+            result = np.sqrt(np.maximum(squares / counts - (sums / counts) ** 2, 0.0))
+        elif stat in ("min", "max"):
+            result = np.full(len(keys), np.inf if stat == "min" else -np.inf)
+            ufunc = np.minimum if stat == "min" else np.maximum
+            ufunc.at(result, inverse, values)
+        else:
+            raise ValueError(f"Unknown statistic: {stat}")
+
+        return {
+            tuple(
+                self._columns[key][1][code] for key, code in zip(group_by, key_codes)
+            ): value.item()
+            for key_codes, value in zip(keys, result)
+        }
+
+    def top_k(self, k: int = 10, largest: bool = False, **filters) -> List[Dict]:
+        """The k lowest (or highest) scored sentences matching the filters"""
+        rows = self.select(**filters)
+        values = np.asarray(self.row_score[rows])
+        k = min(k, len(rows))
+        if k == 0:
+            return []
+        order = np.argpartition(-values if largest else values, k - 1)[:k]
+        order = order[np.argsort(-values[order] if largest else values[order])]
+        return self.records(rows[order])
+
+    def records(self, rows: np.ndarray) -> List[Dict]:
+        records = []
+        for row in rows:
+            entry = self.row_entry[row]
+            prompt_code = self.row_prompt[row]
+            model_code = self.row_model[row]
+            records.append(
+                {
+                    "language": self.languages[self.row_language[row]],
+                    "module": self.modules[self.row_module[row]],
+                    "prompt_id": None
+                    if prompt_code == ORIGINAL
+                    else self.prompt_ids[prompt_code],
+                    "model_name": None
+                    if model_code == ORIGINAL
+                    else self.model_names[model_code],
+                    "entry_id": self.entry_ids[entry],
+                    "marked_correct": self.labels[self.entry_label[entry]],
+                    "score": float(self.row_score[row]),
+                }
+            )
+        return records
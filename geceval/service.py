@@ -0,0 +1,367 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geceval.evaluator import Evaluator, GECModules
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Server Error"}
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests of one (language, module) into
+    batches: a batch is scored once max_batch_size items are waiting or
+    max_latency seconds after its first item arrived. Batches of one module
+    run one at a time on its own thread, the next batch fills meanwhile.
+    If a batch fails, its items are scored one by one, so an error only
+    reaches the requests it comes from.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str], List[Optional[str]]], List[float]],
+        max_batch_size: int = 64,
+        max_latency: float = 0.005,
+        latency_window: int = 10000,
+    ):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+        self.has_items = asyncio.Event()
+        self.is_full = asyncio.Event()
+        self.latencies = deque(maxlen=latency_window)
+        self.batches = 0
+        self.items = 0
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, text: str, reference: Optional[str]) -> float:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((text, reference, future, time.perf_counter()))
+        self.has_items.set()
+        if len(self.pending) >= self.max_batch_size:
+            self.is_full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.has_items.wait()
+            if len(self.pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self.is_full.wait(), self.max_latency)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self.pending[: self.max_batch_size]
+            self.pending = self.pending[self.max_batch_size :]
+            if not self.pending:
+                self.has_items.clear()
+            if len(self.pending) < self.max_batch_size:
+                self.is_full.clear()
+
+            texts = [text for text, _, _, _ in batch]
+            references = [reference for _, reference, _, _ in batch]
+            try:
+                scores = await loop.run_in_executor(
+                    self.executor, self.score_batch, texts, references
+                )
+            except Exception:
+                await self._score_each(batch)
+                continue
+            self._finish(batch, scores)
+
+    async def _score_each(self, batch: List):
+        loop = asyncio.get_running_loop()
+        for item in batch:
+            text, reference, future, _ = item
+            try:
+                scores = await loop.run_in_executor(
+                    self.executor, self.score_batch, [text], [reference]
+                )
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            self._finish([item], scores)
+
+    def _finish(self, batch: List, scores: List[float]):
+        now = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch)
+        for (_, _, future, enqueued), score in zip(batch, scores):
+            self.latencies.append(now - enqueued)
+            if not future.done():
+                future.set_result(score)
+
+    def stats(self) -> Dict:
+        stats = {
+            "queue_depth": len(self.pending),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+        if self.latencies:
+            latencies_ms = np.array(self.latencies) * 1000
+            for q in (50, 90, 99):
+                stats[f"latency_p{q}_ms"] = float(np.percentile(latencies_ms, q))
+        return stats
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class EvaluationService:
+    """
+    Long-running scorer keeping the evaluator modules loaded. POST /score
+    takes {"language", "text", "reference", "metrics"} with metrics given as
+    GECModules names; reference-based metrics compare text (e.g. an LLM
+    correction) against reference (its original), like the evaluator does.
+    GET /stats reports queue depth, batch sizes and latency percentiles.
+    """
+
+    def __init__(
+        self,
+        evaluator: Evaluator,
+        max_batch_size: int = 64,
+        max_latency: float = 0.005,
+    ):
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batchers: Dict[Tuple[str, GECModules], MicroBatcher] = {}
+        self.requests = 0
+        self.started = time.time()
+
+    def _score_batch(
+        self, language: str, module: GECModules, texts: List[str], references
+    ) -> List[float]:
+        gec_module = self.evaluator.get_evaluator(language, module)
+        if gec_module.supports_references:
+            # Originals go first, as in Evaluator.evaluate_module
+            _, scores = gec_module.get_average_pair_score(references, texts)
+        else:
+            _, scores = gec_module.get_average_score(texts)
+        return [float(score) for score in scores]
+
+    def _batcher(self, language: str, module: GECModules) -> MicroBatcher:
+        key = (language, module)
+        if key not in self.batchers:
+            batcher = MicroBatcher(
+                lambda texts, references: self._score_batch(
+                    language, module, texts, references
+                ),
+                self.max_batch_size,
+                self.max_latency,
+            )
+            batcher.start()
+            self.batchers[key] = batcher
+        return self.batchers[key]
+
+    def _parse_modules(self, language: str, metrics, has_reference: bool):
+        if language not in self.evaluator.per_language_modules:
+            raise ValueError(f"Unsupported language: {language}")
+        modules = []
+        for metric in metrics:
+            if metric not in GECModules.__members__:
+                raise ValueError(f"Unknown metric: {metric}")
+            module = GECModules[metric]
+            if module not in self.evaluator.per_language_modules[language]:
+                raise ValueError(f"{metric} does not support {language}")
+            if self.evaluator.construction_map[module].supports_references:
+                if not has_reference:
+                    raise ValueError(f"{metric} needs a reference")
+            modules.append(module)
+        return modules
+
+    @staticmethod
+    def _check_texts(text, reference, metrics):
+        """Reject malformed fields before they join a batch of other requests"""
+        if not isinstance(text, str) or not text:
+            raise ValueError("text must be a non-empty string")
+        if reference is not None and not isinstance(reference, str):
+            raise ValueError("reference must be a string")
+        if not isinstance(metrics, list) or not all(
+            isinstance(metric, str) for metric in metrics
+        ):
+            raise ValueError("metrics must be a list of metric names")
+
+    async def score(
+        self, language: str, text: str, reference: Optional[str], metrics: List[str]
+    ) -> Dict[str, float]:
+        self._check_texts(text, reference, metrics)
+        modules = self._parse_modules(language, metrics, reference is not None)
+        self.requests += 1
+        scores = await asyncio.gather(
+            *[
+                self._batcher(language, module).submit(text, reference)
+                for module in modules
+            ]
+        )
+        return {module.name: score for module, score in zip(modules, scores)}
+
+    async def preload(self, units: List[Tuple[str, GECModules]]):
+        """Construct modules before serving, each on its batcher's thread"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    self._batcher(language, module).executor,
+                    self.evaluator.get_evaluator,
+                    language,
+                    module,
+                )
+                for language, module in units
+            ]
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.requests,
+            "queue_depth": sum(len(b.pending) for b in self.batchers.values()),
+            "modules": {
+                f"{language}:{module.name}": batcher.stats()
+                for (language, module), batcher in self.batchers.items()
+            },
+        }
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "POST" and path == "/score":
+            request = json.loads(body or b"{}")
+            scores = await self.score(
+                request["language"],
+                request["text"],
+                request.get("reference"),
+                request["metrics"],
+            )
+            return 200, {"scores": scores}
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 with keep-alive: JSON bodies sized by Content-Length"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    body = await reader.readexactly(
+                        int(headers.get("content-length", 0))
+                    )
+                except ValueError as error:
+                    # The rest of the stream cannot be framed, so close it
+                    await self._respond(writer, 400, {"error": str(error)}, False)
+                    break
+
+                try:
+                    status, payload = await self._route(method, path, body)
+                except (KeyError, ValueError, TypeError) as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": repr(error)}
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool
+    ):
+        content = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n".encode()
+            + content
+        )
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, preload=()):
+        await self.preload(list(preload))
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+        self.batchers = {}
+        self.evaluator.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="HTTP service scoring texts with warm evaluator modules"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--max_batch_size", help="Largest micro-batch per module", type=int, default=64
+    )
+    parser.add_argument(
+        "--max_latency_ms",
+        help="How long the first request of a batch waits for others",
+        type=float,
+        default=5.0,
+    )
+    parser.add_argument(
+        "--preload",
+        help="language:MODULE pairs to load at startup, comma-separated, "
+        "e.g. en:BLEURT,en:LEVENSHTEIN",
+        default="",
+    )
+    parser.add_argument(
+        "--score_cache", help="SQLite file caching scores between runs", default=None
+    )
+    args = parser.parse_args()
+
+    preload = []
+    for unit in filter(None, args.preload.split(",")):
+        language, module = unit.split(":")
+        preload.append((language, GECModules[module]))
+
+    service = EvaluationService(
+        Evaluator(score_cache_path=args.score_cache),
+        max_batch_size=args.max_batch_size,
+        max_latency=args.max_latency_ms / 1000,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port, preload))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
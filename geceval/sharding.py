@@ -0,0 +1,164 @@
+import argparse
+import zlib
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from geceval.modules.gec_module import corpus_ratio
+from geceval.score_store import ORIGINAL, ScoreStore
+
+SHARD_BY = ("language", "module", "entry")
+
+
+class Shard:
+    """
+    Part i of N of an evaluation. By language or module, whole languages or
+    (language, module) units are assigned round-robin in plan order; by entry,
+    every unit is evaluated on the entries whose id hashes to the shard.
+    """
+
+    def __init__(self, index: int, count: int, by: str = "language"):
+        if by not in SHARD_BY:
+            raise ValueError(f"Unknown shard key: {by}")
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} not in [0, {count})")
+        self.index = index
+        self.count = count
+        self.by = by
+
+    @classmethod
+    def parse(cls, spec: str, by: str = "language") -> "Shard":
+        """Shard from an "i/N" specification, i counting from 0"""
+        index, count = spec.split("/")
+        return cls(int(index), int(count), by)
+
+    def owns(self, position: int) -> bool:
+        return position % self.count == self.index
+
+    def entry_positions(self, entry_ids: List[str]) -> np.ndarray:
+        hashes = np.array(
+            [zlib.crc32(entry_id.encode("utf-8")) for entry_id in entry_ids],
+            dtype=np.int64,
+        )
+        return np.flatnonzero(hashes % self.count == self.index)
+
+    def to_json(self) -> Dict:
+        return {"index": self.index, "count": self.count, "by": self.by}
+
+    def __str__(self):
+        return f"{self.index}/{self.count} by {self.by}"
+
+
+def _rows_in_position_order(rows: Dict, key) -> List[float]:
+    positions = np.concatenate([p for p, _ in rows[key]])
+    scores = np.concatenate([s for _, s in rows[key]])
+    # Entry positions are unique per key, so this is the single-run order
+    return scores[np.argsort(positions, kind="stable")].tolist()
+
+
+def merge_shards(shard_paths: List[str], evaluator=None):
+    """
+    Rebuild the ModuleResults of a sharded evaluation from the partial
+    ScoreStores of all its shards, and report them like Evaluator.evaluate
+    """
+    from geceval.evaluator import Evaluator, GECModules, ModuleResult
+
+    stores = [ScoreStore(path) for path in shard_paths]
+    evaluations = [store.meta["evaluation"] for store in stores]
+    first = evaluations[0]
+    for evaluation in evaluations:
+        if (
+            evaluation["shard"]["count"] != first["shard"]["count"]
+            or evaluation["shard"]["by"] != first["shard"]["by"]
+            or evaluation["comparative"] != first["comparative"]
+            or evaluation["languages"] != first["languages"]
+        ):
+            raise ValueError("Shards come from different evaluations")
+    shard_indices = sorted(e["shard"]["index"] for e in evaluations)
+    if shard_indices != list(range(first["shard"]["count"])):
+        raise ValueError(
+            f"Expected shards 0..{first['shard']['count'] - 1}, got {shard_indices}"
+        )
+
+    rows = defaultdict(list)
+    corpus_statistics = {}
+    module_names = {}
+    for store, evaluation in zip(stores, evaluations):
+        module_names.update(store.module_names)
+        language_offsets = {
+            code: int(np.flatnonzero(store.entry_language == code)[0])
+            for code in np.unique(store.entry_language)
+        }
+        row_language = np.asarray(store.row_language)
+        row_module = np.asarray(store.row_module)
+        row_prompt = np.asarray(store.row_prompt)
+        row_model = np.asarray(store.row_model)
+        keys = np.stack([row_language, row_module, row_prompt, row_model], axis=1)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        # Rows grouped by key, each group in row order
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique_keys) + 1))
+        for idx, (language, module, prompt, model) in enumerate(unique_keys):
+            selected = order[bounds[idx] : bounds[idx + 1]]
+            key = (
+                store.languages[language],
+                store.modules[module],
+                ORIGINAL if prompt == ORIGINAL else store.prompt_ids[prompt],
+                ORIGINAL if model == ORIGINAL else store.model_names[model],
+            )
+            positions = store.row_entry[selected] - language_offsets[language]
+            rows[key].append((positions, np.asarray(store.row_score[selected])))
+
+        for language, module, statistics in evaluation["corpus_statistics"]:
+            if statistics is None:
+                continue
+            total = corpus_statistics.get((language, module), (0.0, 0.0))
+            corpus_statistics[(language, module)] = (
+                total[0] + statistics[0],
+                total[1] + statistics[1],
+            )
+
+    evaluator = evaluator or Evaluator()
+    comparative = first["comparative"]
+    units = {tuple(unit) for evaluation in evaluations for unit in evaluation["units"]}
+    for language, plan in first["languages"].items():
+        for module_name in sorted(
+            {module for unit_language, module in units if unit_language == language},
+            key=lambda name: GECModules[name].value,
+        ):
+            module = GECModules[module_name]
+            result = ModuleResult(
+                language=language,
+                module=module,
+                module_name=module_names[module_name],
+            )
+            if (language, module_name, ORIGINAL, ORIGINAL) in rows:
+                result.original_scores = _rows_in_position_order(
+                    rows, (language, module_name, ORIGINAL, ORIGINAL)
+                )
+                result.original_avg_score = np.mean(result.original_scores)
+            for prompt_id in plan["prompt_ids"]:
+                for model_name in plan["model_names"]:
+                    key = (language, module_name, prompt_id, model_name)
+                    result.corrected_scores[(prompt_id, model_name)] = (
+                        _rows_in_position_order(rows, key) if key in rows else []
+                    )
+            if (language, module_name) in corpus_statistics:
+                result.corpus_statistics = corpus_statistics[(language, module_name)]
+                result.corpus_score = corpus_ratio(result.corpus_statistics)
+            evaluator._report_module(
+                result, plan["prompt_ids"], plan["model_names"], comparative
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge the partial results of a sharded evaluation "
+        "(evaluator.py --shard i/N --score_store PATH) and report them"
+    )
+    parser.add_argument("shard_paths", nargs="+", help="Partial score stores")
+    args = parser.parse_args()
+
+    merge_shards(args.shard_paths)
@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from geceval.correction_index import LanguageIndex
+
+# Resample weights are built for this many (resample, entry) cells at a time
+CHUNK_CELLS = 10_000_000
+
+
+@dataclass
+class SignificanceReport:
+    """Bootstrap intervals and pairwise tests of the models of one prompt"""
+
+    language: str
+    module_name: str
+    prompt_id: object
+    confidence: float
+    means: Dict[str, float] = field(default_factory=dict)
+    intervals: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    # (model_a, model_b) -> (mean difference, bootstrap p, permutation p)
+    tests: Dict[Tuple[str, str], Tuple[float, float, float]] = field(
+        default_factory=dict
+    )
+
+
+def score_matrix(
+    corrected_scores: Dict, language_index: LanguageIndex, prompt_id, model_names
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (models, entries) matrix of per-sentence scores aligned by entry position,
+    and the matching 0/1 matrix of entries a model has a correction for
+    """
+    scores = np.zeros((len(model_names), len(language_index)))
+    present = np.zeros((len(model_names), len(language_index)))
+    for row, model_name in enumerate(model_names):
+        positions = language_index.get_slice(prompt_id, model_name).positions
+        scores[row, positions] = corrected_scores[(prompt_id, model_name)]
+        present[row, positions] = 1.0
+    return scores, present
+
+
+def _resample_weights(
+    num_entries: int, num_samples: int, rng: np.random.Generator
+) -> Iterator[np.ndarray]:
+    """(resamples, entries) counts of each entry in bootstrap resamples, made
+    from one index matrix per chunk"""
+    chunk = max(1, min(num_samples, CHUNK_CELLS // max(num_entries, 1)))
+    for start in range(0, num_samples, chunk):
+        size = min(chunk, num_samples - start)
+        indices = rng.integers(0, num_entries, size=(size, num_entries))
+        indices += np.arange(size)[:, None] * num_entries
+        counts = np.bincount(indices.ravel(), minlength=size * num_entries)
+        yield counts.reshape(size, num_entries).astype(np.float64)
+
+
+def _sign_flips(
+    num_entries: int, num_samples: int, rng: np.random.Generator
+) -> Iterator[np.ndarray]:
+    chunk = max(1, min(num_samples, CHUNK_CELLS // max(num_entries, 1)))
+    for start in range(0, num_samples, chunk):
+        size = min(chunk, num_samples - start)
+        yield rng.choice(np.array([-1.0, 1.0]), size=(size, num_entries))
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def bootstrap_significance(
+    scores: np.ndarray,
+    present: np.ndarray,
+    num_samples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+):
+    """
+    Bootstrap confidence intervals of every row mean, and paired bootstrap and
+    sign-flip permutation p-values of the mean difference of every row pair
+    over the entries both rows have. All rows share the same resamples, each
+    applied to the whole matrix as one matrix product.
+
+    Returns means, (lower, upper) interval arrays, the pairs, their observed
+    differences, bootstrap p-values and permutation p-values.
+    """
+    rng = np.random.default_rng(seed)
+    num_entries = scores.shape[1]
+    pairs = list(combinations(range(len(scores)), 2))
+    first = [a for a, _ in pairs]
+    second = [b for _, b in pairs]
+    pair_present = present[first] * present[second]
+    differences = (scores[first] - scores[second]) * pair_present
+
+    weighted = scores * present
+    means = _ratio(weighted.sum(axis=1), present.sum(axis=1))
+    observed = _ratio(differences.sum(axis=1), pair_present.sum(axis=1))
+
+    resampled_means = []
+    bootstrap_exceed = np.zeros(len(pairs))
+    for weights in _resample_weights(num_entries, num_samples, rng):
+        resampled_means.append(_ratio(weighted @ weights.T, present @ weights.T))
+        resampled = _ratio(differences @ weights.T, pair_present @ weights.T)
+        # Resampled differences centred on the observed one approximate the
+        # null distribution
+        bootstrap_exceed += np.sum(
+            np.abs(resampled - observed[:, None]) >= np.abs(observed[:, None]), axis=1
+        )
+    resampled_means = np.concatenate(resampled_means, axis=1)
+    tail = (1.0 - confidence) / 2 * 100
+    lower = np.nanpercentile(resampled_means, tail, axis=1)
+    upper = np.nanpercentile(resampled_means, 100 - tail, axis=1)
+
+    permutation_exceed = np.zeros(len(pairs))
+    for signs in _sign_flips(num_entries, num_samples, rng):
+        permuted = _ratio(differences @ signs.T, pair_present.sum(axis=1)[:, None])
+        permutation_exceed += np.sum(
+            np.abs(permuted) >= np.abs(observed[:, None]) - 1e-12, axis=1
+        )
+
+    bootstrap_p = (bootstrap_exceed + 1) / (num_samples + 1)
+    permutation_p = (permutation_exceed + 1) / (num_samples + 1)
+    return means, lower, upper, pairs, observed, bootstrap_p, permutation_p
+
+
+def model_significance(
+    result,
+    language_index: LanguageIndex,
+    prompt_ids,
+    model_names,
+    num_samples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> List[SignificanceReport]:
+    """Significance reports of an evaluator ModuleResult, one per prompt"""
+    model_names = list(model_names)
+    reports = []
+    for prompt_id in prompt_ids:
+        scores, present = score_matrix(
+            result.corrected_scores, language_index, prompt_id, model_names
+        )
+        means, lower, upper, pairs, observed, bootstrap_p, permutation_p = (
+            bootstrap_significance(scores, present, num_samples, confidence, seed)
+        )
+        report = SignificanceReport(
+            result.language, result.module_name, prompt_id, confidence
+        )
+        for row, model_name in enumerate(model_names):
+            report.means[model_name] = float(means[row])
+            report.intervals[model_name] = (float(lower[row]), float(upper[row]))
+        for idx, (a, b) in enumerate(pairs):
+            report.tests[(model_names[a], model_names[b])] = (
+                float(observed[idx]),
+                float(bootstrap_p[idx]),
+                float(permutation_p[idx]),
+            )
+        reports.append(report)
+    return reports
+
+
+def format_significance_report(report: SignificanceReport) -> List[str]:
+    prefix = (
+        f"Language: {report.language}\t prompt: {report.prompt_id}"
+        f"\t metric: {report.module_name}"
+    )
+    level = f"{report.confidence * 100:g}%"
+    lines = []
+    for model_name, mean in report.means.items():
+        lower, upper = report.intervals[model_name]
+        lines.append(
+            f"Bootstrap {prefix}\t model: {model_name}\t score: {mean}\t {level} CI: [{lower}, {upper}]"
+        )
+    for (model_a, model_b), (difference, bootstrap_p, permutation_p) in (
+        report.tests.items()
+    ):
+        lines.append(
+            f"Significance {prefix}\t {model_a} - {model_b}: {difference}\t bootstrap p: {bootstrap_p}\t permutation p: {permutation_p}"
+        )
+    return lines
@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Key index of identity pairs: it selects the identity score appended after
+# the unique scores
+IDENTITY = -1
+
+
+class WorkPlan:
+    """
+    Unique texts, or (text, reference) pairs, of one (language, module) unit.
+    Segments (the originals, each (prompt_id, model_name) slice) are added as
+    arrays of key indices, scored once per unique key and fanned back out.
+    Non-empty identical pairs resolve to identity_score when the module has
+    one, without being scored.
+    """
+
+    def __init__(self, identity_score: Optional[float] = None):
+        self.identity_score = identity_score
+        self.texts = []
+        self.references = []
+        self.key_indices: Dict = {}
+        self.num_items = 0
+
+    def _key_index(self, key, text: str, reference: Optional[str]) -> int:
+        index = self.key_indices.get(key)
+        if index is None:
+            index = self.key_indices[key] = len(self.texts)
+            self.texts.append(text)
+            if reference is not None:
+                self.references.append(reference)
+        return index
+
+    def add(self, texts: List[str], references: Optional[List[str]] = None):
+        """Add a segment of texts, or of aligned text/reference pairs"""
+        self.num_items += len(texts)
+        if references is None:
+            return np.array(
+                [self._key_index(text, text, None) for text in texts], dtype=np.int64
+            )
+
+        use_identity = self.identity_score is not None
+        return np.array(
+            [
+                IDENTITY
+                if use_identity and text == reference and text.strip()
+                else self._key_index((text, reference), text, reference)
+                for text, reference in zip(texts, references)
+            ],
+            dtype=np.int64,
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+    def scatter(self, unique_scores, segments: List[np.ndarray]) -> List[List[float]]:
+        """Scores of each segment, in its original order"""
+        scores = np.append(
+            np.asarray(unique_scores, dtype=np.float64),
+            np.nan if self.identity_score is None else self.identity_score,
+        )
+        return [scores[segment].tolist() for segment in segments]
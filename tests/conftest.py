@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# geceval is a namespace package used from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Third-party packages imported by geceval.evaluator through its modules
+EVALUATOR_DEPENDENCIES = (
+    "torch",
+    "bert_score",
+    "evaluate",
+    "fasttext",
+    "huggingface_hub",
+    "language_tool_python",
+    "requests",
+    "sentence_transformers",
+    "spellchecker",
+    "rapidfuzz",
+)
+
+
+@pytest.fixture
+def evaluator_module():
+    """geceval.evaluator, skipping the test where its dependencies are missing"""
+    for dependency in EVALUATOR_DEPENDENCIES:
+        pytest.importorskip(dependency)
+    import geceval.evaluator
+
+    return geceval.evaluator
+
+
+@pytest.fixture
+def merged_data():
+    """Small merged multi-LLM dataset: two languages, two prompts and two
+    models, with one missing and some unchanged corrections"""
+    data = {}
+    for language, sentences in (
+        ("de", ["Das ist gut", "Ich gehe nach hause.", "Er hat ein Hund", "Ja"]),
+        ("en", ["this is good", "I goes home.", "He have a dog", "Yes", "a  b"]),
+    ):
+        lang_data = {}
+        for idx, text in enumerate(sentences):
+            corrections = []
+            for prompt_id in (1, 2):
+                for model_name in ("aya", "phi"):
+                    if (idx, prompt_id, model_name) == (1, 2, "phi"):
+                        continue
+                    content = text if model_name == "aya" else text.capitalize() + "!"
+                    corrections.append(
+                        {
+                            "prompt_id": prompt_id,
+                            "content": content if prompt_id == 1 else content + " ",
+                            "model_name": model_name,
+                        }
+                    )
+            lang_data[f"{language}-{idx}"] = {
+                "marked_correct": idx % 2 == 0,
+                "text": text,
+                "corrections": corrections,
+            }
+        data[language] = lang_data
+    return data
@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.fixture
+def benchmark(evaluator_module):
+    import geceval.benchmark
+
+    return geceval.benchmark
+
+
+def test_generate_dataset_is_deterministic(benchmark):
+    data = benchmark.generate_dataset(20, ["en", "de"], seed=3)
+    assert data == benchmark.generate_dataset(20, ["en", "de"], seed=3)
+    assert data != benchmark.generate_dataset(20, ["en", "de"], seed=4)
+    assert [len(data[language]) for language in ("en", "de")] == [20, 20]
+
+
+def test_compare_results_flags_regressions(benchmark):
+    def results(throughput):
+        return {
+            "modules": [
+                {
+                    "language": "en",
+                    "module": "GLEU",
+                    "batch_size": 32,
+                    "sentences_per_sec": throughput,
+                }
+            ],
+            "evaluator": [{"workers": 1, "sentences_per_sec": 100.0}],
+        }
+
+    assert benchmark.compare_results(results(100.0), results(95.0), 0.1) == []
+    regressions = benchmark.compare_results(results(100.0), results(50.0), 0.1)
+    assert [key for key, _ in regressions] == ["en\tGLEU\tbatch: 32"]
+
+
+def test_evaluator_restricted_to_modules(evaluator_module):
+    GECModules = evaluator_module.GECModules
+    evaluator = evaluator_module.Evaluator(
+        modules=[GECModules.GLEU, GECModules.SPELLCHECKING, GECModules.LEVENSHTEIN]
+    )
+    assert evaluator.plan_units(["en", "cs"], True) == [
+        ("en", GECModules.LEVENSHTEIN),
+        ("en", GECModules.GLEU),
+        ("cs", GECModules.LEVENSHTEIN),
+        ("cs", GECModules.GLEU),
+    ]
+    assert evaluator.plan_units(["en", "cs"], False) == [
+        ("en", GECModules.SPELLCHECKING)
+    ]
+
+
+def test_pair_latency_times_distinct_single_pairs(benchmark):
+    from geceval.correction_index import LanguageIndex
+
+    data = benchmark.generate_dataset(10, ["en"], seed=1)
+    language_index = LanguageIndex.from_data("en", data["en"])
+    result = benchmark._run_pair_latency(
+        language_index, benchmark.GECModules.GLEU, 5, True
+    )
+    assert result["items"] == 5
+    assert 0 < result["pair_p50_ms"] <= result["pair_p90_ms"] <= result["pair_p99_ms"]
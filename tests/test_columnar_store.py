@@ -0,0 +1,47 @@
+import numpy as np
+
+from geceval.columnar_store import ColumnarDataset, is_columnar, write_columnar
+from geceval.correction_index import LanguageIndex
+from geceval.file_loaders import iter_merged_entries, write_merged
+
+
+def assert_same_index(index: LanguageIndex, expected: LanguageIndex):
+    assert index.language == expected.language
+    assert index.entry_ids == expected.entry_ids
+    assert index.original_texts == expected.original_texts
+    assert index.marked_correct == expected.marked_correct
+    assert index.slices.keys() == expected.slices.keys()
+    for key, expected_slice in expected.slices.items():
+        assert np.array_equal(index.slices[key].positions, expected_slice.positions)
+        assert index.slices[key].texts == expected_slice.texts
+
+
+def test_round_trip(merged_data, tmp_path):
+    entries = [
+        (language, entry_id, entry)
+        for language, lang_data in merged_data.items()
+        for entry_id, entry in lang_data.items()
+    ]
+    write_columnar(entries, tmp_path / "merged")
+    assert is_columnar(tmp_path / "merged")
+    assert dict(ColumnarDataset(tmp_path / "merged").iter_languages()) == merged_data
+
+
+def test_language_index_matches_json(merged_data, tmp_path):
+    write_merged(merged_data, tmp_path / "merged.jsonl")
+    write_columnar(iter_merged_entries(tmp_path / "merged.jsonl"), tmp_path / "merged")
+    dataset = ColumnarDataset(tmp_path / "merged")
+    for language, lang_data in merged_data.items():
+        assert_same_index(
+            dataset.language_index(language),
+            LanguageIndex.from_data(language, lang_data),
+        )
+
+
+def test_language_index_selects_prompts_and_models(merged_data, tmp_path):
+    write_merged(merged_data, tmp_path / "merged")
+    index = ColumnarDataset(tmp_path / "merged").language_index(
+        "en", prompt_ids=[2], model_names=["phi", "unknown"]
+    )
+    assert list(index.slices) == [(2, "phi")]
+    assert np.array_equal(index.slices[(2, "phi")].positions, [0, 2, 3, 4])
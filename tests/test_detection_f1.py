@@ -0,0 +1,56 @@
+import pytest
+
+from geceval.correction_index import LanguageIndex
+from geceval.detection_f1 import detection_f1
+
+
+@pytest.fixture
+def labelled_data(merged_data):
+    """merged_data with the "correct"/"incorrect" labels of real datasets"""
+    for lang_data in merged_data.values():
+        for entry in lang_data.values():
+            entry["marked_correct"] = (
+                "correct" if entry["marked_correct"] else "incorrect"
+            )
+    return merged_data
+
+
+def test_counts_per_model_and_baseline(labelled_data):
+    language_index = LanguageIndex.from_data("en", labelled_data["en"])
+    report = detection_f1(language_index, [1], ["aya"], "phi", tokenizer="regex")
+    assert (report.total, report.correct) == (5, 3)
+    # aya never changes a text: the correct ones are kept, the others missed
+    aya = report.per_model["aya"]
+    assert (aya.tp, aya.fp, aya.fn) == (3, 0, 2)
+    assert "phi" not in report.per_model
+    assert report.per_model["always_one"].f1 == pytest.approx(0.75)
+    assert report.per_model["always_zero"].tp == 2
+
+
+def test_baseline_outside_selected_models(
+    evaluator_module, labelled_data, tmp_path, capsys
+):
+    from geceval.file_loaders import write_merged
+
+    reports = []
+    for path in (tmp_path / "merged.jsonl", tmp_path / "columnar"):
+        write_merged(labelled_data, path)
+        evaluator = evaluator_module.Evaluator(
+            modules=[evaluator_module.GECModules.LEVENSHTEIN], tokenizer="regex"
+        )
+        evaluator.evaluate(
+            str(path),
+            use_comparative_metrics=True,
+            model_names=["aya"],
+            languages=["en"],
+            report_detection_f1=True,
+            baseline_model="phi",
+        )
+        output = capsys.readouterr().out
+        reports.append([line for line in output.splitlines() if "Detection" in line])
+
+    jsonl, columnar = reports
+    assert columnar == jsonl
+    # Computed from the slices of phi, which is not among the evaluated models
+    always_zero = "Model: always_zero,\t\tp: 1.0,\tr: 0.3333333333333333,"
+    assert always_zero in "\n".join(columnar)
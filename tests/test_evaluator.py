@@ -0,0 +1,76 @@
+import pytest
+
+from geceval.modules.model_registry import shared_models
+
+
+def test_close_keeps_shared_models(evaluator_module):
+    model = shared_models.get(("test", "model"), object)
+    evaluator_module.Evaluator().close()
+    assert shared_models.get(("test", "model"), object) is model
+
+
+def test_columnar_languages_in_requested_order(evaluator_module, merged_data, tmp_path):
+    from geceval.file_loaders import write_merged
+
+    write_merged(merged_data, tmp_path / "merged")
+    evaluator = evaluator_module.Evaluator()
+    indexes = evaluator.iter_language_indexes(str(tmp_path / "merged"), ["en", "de"])
+    assert [index.language for index in indexes] == ["en", "de"]
+
+    with pytest.raises(KeyError):
+        list(evaluator.iter_language_indexes(str(tmp_path / "merged"), ["en", "xx"]))
+
+
+def test_json_languages_in_file_order(evaluator_module, merged_data, tmp_path, capsys):
+    from geceval.file_loaders import write_merged
+
+    write_merged(merged_data, tmp_path / "merged.jsonl")
+    evaluator = evaluator_module.Evaluator()
+    indexes = evaluator.iter_language_indexes(
+        str(tmp_path / "merged.jsonl"), ["en", "de", "xx"]
+    )
+    assert [index.language for index in indexes] == ["de", "en"]
+    assert "no data for xx" in capsys.readouterr().out
+
+
+def test_json_load_timed_per_language(
+    evaluator_module, merged_data, tmp_path, monkeypatch
+):
+    from geceval.file_loaders import write_merged
+    from geceval.profiling import profiler
+
+    write_merged(merged_data, tmp_path / "merged.jsonl")
+    monkeypatch.setattr(profiler, "enabled", True)
+    profiler.drain()
+    evaluator = evaluator_module.Evaluator()
+    list(evaluator.iter_language_indexes(str(tmp_path / "merged.jsonl"), ["en"]))
+    loads = [event for event in profiler.drain() if event["name"] == "load_dataset"]
+    timed = [
+        (event["args"].get("language"), event["args"].get("items")) for event in loads
+    ]
+    assert timed == [("de", 4), ("en", 5), (None, None)]
+
+
+def test_workers_report_like_a_single_process(
+    evaluator_module, merged_data, tmp_path, capsys
+):
+    from geceval.file_loaders import write_merged
+
+    GECModules = evaluator_module.GECModules
+    write_merged(merged_data, tmp_path / "merged.jsonl")
+    outputs = []
+    for num_workers in (1, 2):
+        evaluator = evaluator_module.Evaluator(
+            modules=[GECModules.LEVENSHTEIN, GECModules.JACCARD, GECModules.GLEU],
+            tokenizer="regex",
+        )
+        evaluator.evaluate(
+            str(tmp_path / "merged.jsonl"),
+            use_comparative_metrics=True,
+            languages=["de", "en"],
+            num_workers=num_workers,
+        )
+        output = capsys.readouterr().out
+        outputs.append([line for line in output.splitlines() if "Language:" in line])
+    assert outputs[1] == outputs[0]
+    assert len(outputs[0]) > 0
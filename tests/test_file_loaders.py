@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from geceval.file_loaders import (
+    convert_merged_json_to_jsonl,
+    iter_merged_languages,
+    load_multi_llm_json_outputs,
+    write_merged,
+)
+
+
+def write_llm_outputs(merged_data, directory):
+    """Per-model/per-prompt output files from which merged_data is merged"""
+    outputs = {}
+    for language, lang_data in merged_data.items():
+        for entry_id, entry in lang_data.items():
+            for correction in entry["corrections"]:
+                key = (correction["model_name"], correction["prompt_id"])
+                outputs.setdefault(key, {}).setdefault(language, []).append(
+                    {
+                        "id": entry_id,
+                        "label": entry["marked_correct"],
+                        "content": entry["text"],
+                        "processed": correction["content"],
+                    }
+                )
+    for (model_name, prompt_id), data in outputs.items():
+        with open(directory / f"{model_name}_output_{prompt_id}.json", "w") as out:
+            json.dump(data, out)
+
+
+def sorted_corrections(data):
+    for lang_data in data.values():
+        for entry in lang_data.values():
+            entry["corrections"].sort(key=lambda c: (c["prompt_id"], c["model_name"]))
+    return data
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_merge_outputs(merged_data, tmp_path, num_workers, monkeypatch):
+    monkeypatch.setattr("geceval.file_loaders.MIN_FILES_PER_WORKER", 1)
+    (tmp_path / "outputs").mkdir()
+    write_llm_outputs(merged_data, tmp_path / "outputs")
+    output_path = tmp_path / "merged.jsonl"
+    result = load_multi_llm_json_outputs(
+        tmp_path / "outputs", str(output_path), num_workers=num_workers
+    )
+    written = dict(iter_merged_languages(output_path))
+    assert sorted_corrections(result) == sorted_corrections(merged_data)
+    assert sorted_corrections(written) == result
+
+
+def test_merge_only_new(merged_data, tmp_path):
+    (tmp_path / "outputs").mkdir()
+    write_llm_outputs(merged_data, tmp_path / "outputs")
+    output_path = str(tmp_path / "merged.json")
+    new_output = tmp_path / "outputs" / "phi_output_2.json"
+    new_output.rename(tmp_path / "new.json")
+    load_multi_llm_json_outputs(tmp_path / "outputs", output_path)
+    (tmp_path / "new.json").rename(new_output)
+    result = load_multi_llm_json_outputs(
+        tmp_path / "outputs", output_path, only_new=True
+    )
+    assert sorted_corrections(result) == sorted_corrections(merged_data)
+
+
+@pytest.mark.parametrize("name", ["merged.json", "merged.json.xz", "merged.jsonl.xz"])
+def test_write_merged_formats(merged_data, tmp_path, name):
+    write_merged(merged_data, tmp_path / name)
+    assert dict(iter_merged_languages(tmp_path / name)) == merged_data
+
+
+def test_write_merged_unknown_suffix(merged_data, tmp_path):
+    with pytest.raises(ValueError):
+        write_merged(merged_data, tmp_path / "merged.jsn")
+    write_merged(merged_data, str(tmp_path / "columnar.v2") + "/")
+    assert dict(iter_merged_languages(tmp_path / "columnar.v2")) == merged_data
+
+
+def test_convert_columnar_to_jsonl(merged_data, tmp_path):
+    write_merged(merged_data, tmp_path / "columnar")
+    convert_merged_json_to_jsonl(tmp_path / "columnar", tmp_path / "merged.jsonl.xz")
+    assert dict(iter_merged_languages(tmp_path / "merged.jsonl.xz")) == merged_data
@@ -0,0 +1,62 @@
+import pytest
+from nltk.translate.gleu_score import corpus_gleu, sentence_gleu
+
+from geceval.modules.gleu import GleuModule
+from geceval.modules.lexical_engine import regex_tokenize
+
+TEXTS = [
+    "the cat sat on the mat",
+    "He go to school every day .",
+    "a a a b",
+    "Completely different words here",
+    "same sentence",
+]
+REFERENCES = [
+    "the cat sat on a mat",
+    "He goes to school every day .",
+    "a a b b",
+    "nothing in common",
+    "same sentence",
+]
+
+
+@pytest.mark.parametrize("min_len, max_len", [(1, 4), (1, 2), (2, 3)])
+def test_sentence_scores_match_nltk(min_len, max_len):
+    module = GleuModule("en", min_len, max_len, tokenizer="regex")
+    expected = [
+        sentence_gleu(
+            [regex_tokenize(reference)], regex_tokenize(text), min_len, max_len
+        )
+        for text, reference in zip(TEXTS, REFERENCES)
+    ]
+    assert module.score_pairs(TEXTS, REFERENCES) == pytest.approx(expected)
+
+
+def test_corpus_statistics_match_nltk():
+    module = GleuModule("en", tokenizer="regex")
+    tp, n_all = module.get_corpus_pair_statistics(TEXTS, REFERENCES)
+    expected = corpus_gleu(
+        [[regex_tokenize(reference)] for reference in REFERENCES],
+        [regex_tokenize(text) for text in TEXTS],
+    )
+    assert tp / n_all == pytest.approx(expected)
+
+
+def test_scores_independent_of_batch():
+    module = GleuModule("en", tokenizer="regex")
+    batched = module.score_pairs(TEXTS, REFERENCES)
+    single = [module.score_pair(text, ref) for text, ref in zip(TEXTS, REFERENCES)]
+    assert batched == pytest.approx(single)
+    assert module.score_pairs([""], [""]) == [0.0]
+
+
+@pytest.mark.parametrize("min_len", [1, 2])
+def test_identity_score_matches_scoring(min_len):
+    from geceval.work_plan import WorkPlan
+
+    module = GleuModule("en", min_len, tokenizer="regex")
+    texts = ["Yes", "the cat sat", "!"]
+    plan = WorkPlan(module.identity_score)
+    segment = plan.add(texts, texts)
+    planned = plan.scatter(module.score_pairs(plan.texts, plan.references), [segment])
+    assert planned == [module.score_pairs(texts, texts)]
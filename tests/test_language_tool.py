@@ -0,0 +1,101 @@
+import pytest
+
+language_tool_python = pytest.importorskip("language_tool_python")
+requests = pytest.importorskip("requests")
+
+from geceval.modules.language_tool_module import LanguageToolModule  # noqa: E402
+
+
+class FakeServer:
+    """Reports one match per "!", or fails every check if dead"""
+
+    language_tool_download_version = "test"
+    dead = []
+
+    def __init__(self, language, remote_server=None):
+        self.is_dead = bool(FakeServer.dead) and FakeServer.dead.pop(0)
+        self.checks = 0
+
+    def check(self, text):
+        self.checks += 1
+        if self.is_dead:
+            raise requests.exceptions.ConnectionError("server is down")
+        return [f"match at {i}" for i, c in enumerate(text) if c == "!"]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_servers(monkeypatch):
+    monkeypatch.setattr(language_tool_python, "LanguageTool", FakeServer)
+
+
+def test_retries_connection_errors_on_other_server(fake_servers):
+    FakeServer.dead = [True, False]
+    module = LanguageToolModule("en", num_servers=2, retry_delay=0)
+    texts = [f"text {i}!" for i in range(20)]
+    assert module.score_texts(texts) == [0.5] * 20
+    dead, alive = module.servers
+    assert alive.checks == 20
+    assert dead.checks > 0
+
+
+def test_raises_when_all_servers_fail(fake_servers):
+    FakeServer.dead = [True]
+    module = LanguageToolModule("en", max_retries=2, retry_delay=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        module.score_texts(["text"])
+    assert module.servers[0].checks == 3
+
+
+def test_bounded_memo_keeps_batch_results(fake_servers):
+    from geceval.modules.memo import LRUMemo
+
+    FakeServer.dead = []
+    module = LanguageToolModule("en")
+    module.text_matches = LRUMemo(2)
+    texts = ["a", "b!", "c!!", "a"]
+    assert module.score_texts(texts) == [1.0, 0.5, 1 / 3, 1.0]
+    assert len(module.text_matches) == 2
+    assert module.score_texts(["c!!", "b!"]) == [1 / 3, 0.5]
+
+
+class FakeMatch:
+    def __init__(self, offset):
+        self.offset = offset
+
+
+class MatchServer(FakeServer):
+    """Reports a FakeMatch at every "!" """
+
+    def check(self, text):
+        self.checks += 1
+        return [FakeMatch(i) for i, c in enumerate(text) if c == "!"]
+
+
+class PeriodSplitter:
+    """Sentences end at each period followed by a space"""
+
+    def span_tokenize(self, text):
+        start = 0
+        while start < len(text):
+            end = text.find(". ", start)
+            end = len(text) if end == -1 else end + 1
+            yield start, end
+            start = end + 1
+
+
+def test_incremental_offsets_and_reuse(monkeypatch):
+    monkeypatch.setattr(language_tool_python, "LanguageTool", MatchServer)
+    module = LanguageToolModule("en", incremental=True)
+    module.sentence_splitter = PeriodSplitter()
+
+    def offsets(texts):
+        return [[match.offset for match in m] for m in module.get_matches(texts)]
+
+    assert offsets(["Hey! Yes. Ok.", "Ok. Hey! Yes."]) == [[3], [7]]
+    assert module.servers[0].checks == 2
+    # Only the new sentence is checked, the cached matches keep their offsets
+    assert offsets(["Fine. Hey! Yes.", "Hey! Yes."]) == [[9], [3]]
+    assert module.servers[0].checks == 3
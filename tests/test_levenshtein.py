@@ -0,0 +1,39 @@
+import pytest
+
+Levenshtein = pytest.importorskip("Levenshtein")
+pytest.importorskip("rapidfuzz")
+
+from geceval.modules.levenshtein_module import LevenshteinModule  # noqa: E402
+
+TEXTS = ["kitten", "flaw", "", "same", "Straße"]
+REFERENCES = ["sitting", "lawn", "abc", "same", "Strasse"]
+
+
+def test_bulk_scores_match_python_levenshtein():
+    scores = LevenshteinModule("en").bulk_scores(
+        TEXTS, REFERENCES, edit_operations=True
+    )
+    distances = [Levenshtein.distance(t, r) for t, r in zip(TEXTS, REFERENCES)]
+    assert scores["distance"].tolist() == distances
+    assert scores["inverse"].tolist() == [1 / (1 + d) for d in distances]
+    assert scores["normalized"].tolist() == [
+        1 - d / max(len(t), len(r), 1) for d, t, r in zip(distances, TEXTS, REFERENCES)
+    ]
+    operations = scores["insert"] + scores["delete"] + scores["replace"]
+    assert operations.tolist() == distances
+
+
+def test_variants():
+    inverse = LevenshteinModule("en")
+    normalized = LevenshteinModule("en", variant="normalized")
+    assert inverse.score_pairs(TEXTS, REFERENCES) == [
+        inverse.score_pair(t, r) for t, r in zip(TEXTS, REFERENCES)
+    ]
+    assert normalized.score_pairs(["abcd"], ["abce"]) == [0.75]
+    assert normalized.score_pair("abcd", "abce") == 0.75
+    assert normalized.score_pairs(TEXTS, REFERENCES) == [
+        normalized.score_pair(t, r) for t, r in zip(TEXTS, REFERENCES)
+    ]
+    assert inverse.get_cache_namespace() != normalized.get_cache_namespace()
+    with pytest.raises(ValueError):
+        LevenshteinModule("en", variant="other")
@@ -0,0 +1,75 @@
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+
+from geceval.modules.jaccard_distance import JaccardDistanceModule
+from geceval.modules.lexical_engine import (
+    LexicalEngine,
+    get_lexical_engine,
+    regex_tokenize,
+)
+from geceval.modules.token_count_distance import TokenCountDistanceModule
+
+
+@pytest.mark.parametrize(
+    "text, tokens",
+    [
+        ("I don't know.", ["I", "do", "n't", "know", "."]),
+        ('He said "no", then', ["He", "said", "``", "no", "''", ",", "then"]),
+        ("It's 3.5 km... wait", ["It", "'s", "3.5", "km", "...", "wait"]),
+        ("Mr. Smith in the U.S.", ["Mr", ".", "Smith", "in", "the", "U.S", "."]),
+        ("Visit b.com at 10:30", ["Visit", "b.com", "at", "10:30"]),
+        ("O'Neil's rock'n'roll", ["O'Neil", "'s", "rock'n'roll"]),
+    ],
+)
+def test_regex_tokenize(text, tokens):
+    assert regex_tokenize(text) == tokens
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I goes home.",
+        "He have a dog, it's 3.5 km -- wait!",
+        'She said "It\'s fine" and left (quickly).',
+        "We've been there; they'd said we'll go, you're right.",
+        "Prices rose 3.2% in Q3, the highest since '08.",
+        "Visit www.example.com or open file.txt at 10:30, version 2.x.",
+        "Er hat's gesagt: (ja) [nein] {x} <y>.",
+        "Wir treffen uns um 14:00 Uhr im Café \"Zur Post\".",
+        "Die E-Mail-Adresse lautet info@firma.de, bitte schreiben!",
+        "L'uomo è arrivato dell'anno scorso.",
+        "Quell'anno c'era un po' di neve, vero?",
+        "«Ciao» disse, all'università nell'estate del 2019.",
+        "Han sa: \"Jag kommer i morgon.\"",
+        "Det är 3,5 km till Göteborg!",
+        "Příliš žluťoučký kůň úpěl ďábelské ódy.",
+        "Zítra v 8:15 přijede vlak číslo 123...",
+    ],
+)
+def test_regex_tokenize_matches_treebank(text):
+    # word_tokenize applies these rules per punkt sentence; with one sentence
+    # and no abbreviations, that is the whole text
+    assert regex_tokenize(text) == NLTKWordTokenizer().tokenize(text)
+
+
+def test_pair_scores():
+    engine = LexicalEngine("en", "regex")
+    scores = engine.pair_scores(["a b c", "a a"], ["a b d e", "a a"])
+    assert scores["jaccard"].tolist() == [2 / 5, 1.0]
+    assert scores["token_count"].tolist() == [3 / 4, 1.0]
+
+
+def test_module_close_keeps_shared_engine():
+    jaccard = JaccardDistanceModule("en", tokenizer="regex")
+    token_count = TokenCountDistanceModule("en", tokenizer="regex")
+    assert jaccard.engine is token_count.engine is get_lexical_engine("en", "regex")
+
+    jaccard.score_pairs(["a b"], ["a c"])
+    jaccard.close()
+    assert "a b" in token_count.engine.tokens
+
+
+def test_evaluator_tokenizer_reaches_lexical_modules(evaluator_module):
+    evaluator = evaluator_module.Evaluator(tokenizer="regex")
+    for module in evaluator_module.LEXICAL_MODULES:
+        assert evaluator.get_evaluator("en", module).tokenizer == "regex"
@@ -0,0 +1,49 @@
+from geceval.modules.memo import LRUMemo
+
+
+def test_evicts_least_recently_used():
+    memo = LRUMemo(max_items=2)
+    memo["a"] = 1
+    memo["b"] = 2
+    assert memo["a"] == 1
+    memo["c"] = 3
+    assert "b" not in memo
+    assert memo.get("a") == 1 and memo.get("c") == 3
+    assert len(memo) == 2
+
+
+def test_unbounded_and_missing():
+    memo = LRUMemo(max_items=None)
+    for i in range(1000):
+        memo[i] = i
+    assert len(memo) == 1000
+    assert memo.get("missing", 0) == 0
+    memo.clear()
+    assert len(memo) == 0
+
+
+def test_get_many_and_concurrent_eviction():
+    import threading
+
+    memo = LRUMemo(max_items=8)
+    memo["a"] = None
+    assert memo.get_many(["a", "b"]) == {"a": None}
+
+    errors = []
+
+    def churn(offset):
+        try:
+            for i in range(20000):
+                memo[offset + i % 16] = i
+                memo.get(offset + (i + 3) % 16)
+                memo.get_many([offset + (i + 5) % 16])
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=churn, args=(offset,)) for offset in (0, 8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(memo) == 8
@@ -0,0 +1,26 @@
+import threading
+import time
+
+from geceval.modules.model_registry import ModelRegistry
+
+
+def test_concurrent_get_constructs_once():
+    registry = ModelRegistry()
+    constructed = []
+
+    def factory():
+        time.sleep(0.01)
+        constructed.append(object())
+        return constructed[-1]
+
+    models = []
+    threads = [
+        threading.Thread(target=lambda: models.append(registry.get("key", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(constructed) == 1
+    assert all(model is constructed[0] for model in models)
@@ -0,0 +1,20 @@
+from geceval.profiling import Profiler, span
+
+
+def test_disabled_spans_do_not_share_arguments():
+    with span("load_dataset") as first:
+        first["language"] = "en"
+    with span("load_dataset") as second:
+        assert second == {}
+
+
+def test_summary_per_language():
+    profiler = Profiler()
+    profiler.enable()
+    for language, items in (("en", 3), ("de", 2), ("en", 4)):
+        with profiler.span("score", language=language) as span_args:
+            span_args["items"] = items
+    rows = {row["language"]: row for row in profiler.summary()}
+    assert (rows["en"]["calls"], rows["en"]["items"]) == (2, 7)
+    assert (rows["de"]["calls"], rows["de"]["items"]) == (1, 2)
+    assert rows["en"]["process_peak_rss_mb"] > 0
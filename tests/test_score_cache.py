@@ -0,0 +1,49 @@
+import math
+
+from geceval.score_cache import ScoreCache, score_with_cache, text_digest
+
+
+def test_round_trip(tmp_path):
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"))
+    cache.put_many("ns", [(text_digest("a"), 0.5), (text_digest("a", "b"), 1.0)])
+    assert cache.get_many("ns", [text_digest("a"), text_digest("a", "b")]) == {
+        text_digest("a"): 0.5,
+        text_digest("a", "b"): 1.0,
+    }
+    assert cache.get_many("other", [text_digest("a")]) == {}
+    cache.close()
+
+
+def test_non_finite_scores_are_not_stored(tmp_path):
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"))
+    cache.put_many(
+        "ns",
+        [
+            (text_digest("nan"), float("nan")),
+            (text_digest("none"), None),
+            (text_digest("ok"), 0.25),
+        ],
+    )
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_score_with_cache_computes_missing_once(tmp_path):
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"))
+    calls = []
+
+    def compute(texts, references):
+        calls.append(list(texts))
+        return [
+            float("nan") if t == "" else len(t) / len(r)
+            for t, r in zip(texts, references)
+        ]
+
+    texts, references = ["ab", "ab", "", "abc"], ["abcd", "abcd", "x", "abc"]
+    scores = score_with_cache(cache, "ns", texts, references, compute)
+    assert scores[:2] == [0.5, 0.5] and scores[3] == 1.0 and math.isnan(scores[2])
+    assert calls == [["ab", "", "abc"]]
+
+    score_with_cache(cache, "ns", texts, references, compute)
+    assert calls[-1] == [""]
+    cache.close()
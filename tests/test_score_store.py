@@ -0,0 +1,97 @@
+from enum import Enum
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from geceval.correction_index import LanguageIndex
+from geceval.score_store import ScoreStore, ScoreStoreWriter
+
+
+class Modules(Enum):
+    LENGTH = 1
+
+
+def length_result(language_index: LanguageIndex):
+    """ModuleResult-like scores: the length of each original and correction"""
+    return SimpleNamespace(
+        language=language_index.language,
+        module=Modules.LENGTH,
+        module_name="Length",
+        original_scores=[float(len(t)) for t in language_index.original_texts],
+        corrected_scores={
+            key: [float(len(t)) for t in correction_slice.texts]
+            for key, correction_slice in language_index.slices.items()
+        },
+    )
+
+
+@pytest.fixture
+def store(merged_data, tmp_path):
+    writer = ScoreStoreWriter()
+    for language, lang_data in merged_data.items():
+        language_index = LanguageIndex.from_data(language, lang_data)
+        writer.add_result(length_result(language_index), language_index)
+    writer.save(tmp_path / "store")
+    return ScoreStore(tmp_path / "store")
+
+
+def expected_lengths(merged_data, **filters):
+    lengths = []
+    for language, lang_data in merged_data.items():
+        for entry in lang_data.values():
+            for correction in entry["corrections"]:
+                values = dict(language=language, **correction)
+                values["marked_correct"] = entry["marked_correct"]
+                if all(values[key] == value for key, value in filters.items()):
+                    lengths.append(len(correction["content"]))
+    return np.array(lengths, dtype=np.float64)
+
+
+def test_scores_and_filters(store, merged_data):
+    assert len(store) == sum(
+        1 + len(entry["corrections"])
+        for lang_data in merged_data.values()
+        for entry in lang_data.values()
+    )
+    assert np.array_equal(
+        np.sort(store.scores(language="en", model_name="phi")),
+        np.sort(expected_lengths(merged_data, language="en", model_name="phi")),
+    )
+    assert np.array_equal(
+        store.scores(language="de", originals=True),
+        [len(entry["text"]) for entry in merged_data["de"].values()],
+    )
+    assert len(store.select(marked_correct=True, prompt_id=[1, 2])) == len(
+        expected_lengths(merged_data, marked_correct=True)
+    )
+
+
+@pytest.mark.parametrize("stat", ["mean", "sum", "count", "min", "max", "std"])
+def test_aggregate(store, merged_data, stat):
+    aggregates = store.aggregate(group_by=("language", "model_name"), stat=stat)
+    assert set(aggregates) == {
+        (language, model) for language in ("de", "en") for model in ("aya", "phi")
+    }
+    for (language, model_name), value in aggregates.items():
+        lengths = expected_lengths(
+            merged_data, language=language, model_name=model_name
+        )
+        expected = len(lengths) if stat == "count" else getattr(np, stat)(lengths)
+        assert value == pytest.approx(expected)
+
+
+def test_aggregate_without_groups(store, merged_data):
+    assert store.aggregate(group_by=(), stat="count") == {
+        (): len(expected_lengths(merged_data))
+    }
+    assert store.aggregate(language="xx") == {}
+
+
+def test_top_k(store):
+    records = store.top_k(k=2, largest=True, language="en")
+    assert [r["score"] for r in records] == sorted(
+        store.scores(language="en"), reverse=True
+    )[:2]
+    assert records[0]["module"] == "LENGTH"
+    assert records[0]["entry_id"].startswith("en-")
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def service_module(evaluator_module):
+    import geceval.service
+
+    return geceval.service
+
+
+def test_failing_item_does_not_fail_its_batch(service_module):
+    def score_batch(texts, references):
+        if "bad" in texts:
+            raise RuntimeError("bad text")
+        return [float(len(text)) for text in texts]
+
+    async def run():
+        batcher = service_module.MicroBatcher(score_batch, max_latency=0.05)
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.submit("good", None),
+                batcher.submit("bad", None),
+                batcher.submit("fine!", None),
+                return_exceptions=True,
+            ), batcher.stats()
+        finally:
+            batcher.close()
+
+    (good, bad, fine), stats = asyncio.run(run())
+    assert (good, fine) == (4.0, 5.0)
+    assert isinstance(bad, RuntimeError)
+    assert stats["items"] == 2
+
+
+@pytest.mark.parametrize(
+    "text, reference, metrics",
+    [("", None, ["LEVENSHTEIN"]), (3, None, []), ("a", 1, []), ("a", None, "GLEU")],
+)
+def test_malformed_fields_rejected(
+    service_module, evaluator_module, text, reference, metrics
+):
+    service = service_module.EvaluationService(evaluator_module.Evaluator())
+    with pytest.raises(ValueError):
+        asyncio.run(service.score("en", text, reference, metrics))
+    assert service.batchers == {}
+
+
+def test_malformed_request_line_is_bad_request(service_module, evaluator_module):
+    service = service_module.EvaluationService(evaluator_module.Evaluator())
+
+    async def run():
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GARBAGE\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    response = asyncio.run(run())
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
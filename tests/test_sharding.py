@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from geceval.correction_index import LanguageIndex
+
+MISSING = "missing corrections"
+LANGUAGES = ["de", "en"]
+
+
+@pytest.fixture
+def lexical_evaluator(evaluator_module):
+    """Evaluator restricted to modules that need no models or servers"""
+    GECModules = evaluator_module.GECModules
+
+    def make():
+        return evaluator_module.Evaluator(
+            modules=[
+                GECModules.LEVENSHTEIN,
+                GECModules.JACCARD,
+                GECModules.TOKEN_COUNT_DISTANCE,
+                GECModules.GLEU,
+                GECModules.PUNCTUATION_SEEKER,
+                GECModules.SPELLCHECKING,
+            ],
+            tokenizer="regex",
+        )
+
+    return make
+
+
+@pytest.fixture
+def data_path(merged_data, tmp_path):
+    from geceval.file_loaders import write_merged
+
+    path = tmp_path / "merged.jsonl"
+    write_merged(merged_data, path)
+    return str(path)
+
+
+def report_lines(output: str):
+    """Score lines, without the construction and missing-correction logs"""
+    return [line for line in output.splitlines() if "metric:" in line]
+
+
+def missing_lines(output: str):
+    return sorted(line for line in output.splitlines() if MISSING in line)
+
+
+@pytest.mark.parametrize("by", ["language", "module", "entry"])
+@pytest.mark.parametrize("comparative", [False, True])
+def test_merged_shards_match_single_run(
+    lexical_evaluator, data_path, tmp_path, capsys, by, comparative
+):
+    from geceval.sharding import Shard, merge_shards
+
+    lexical_evaluator().evaluate(
+        data_path, use_comparative_metrics=comparative, languages=LANGUAGES
+    )
+    single = capsys.readouterr().out
+
+    paths = [str(tmp_path / f"shard_{index}") for index in range(2)]
+    for index, path in enumerate(paths):
+        lexical_evaluator().evaluate(
+            data_path,
+            use_comparative_metrics=comparative,
+            languages=LANGUAGES,
+            score_store_path=path,
+            shard=Shard(index, 2, by),
+        )
+    sharded = capsys.readouterr().out
+    merge_shards(paths, lexical_evaluator())
+    merged = capsys.readouterr().out
+
+    assert report_lines(merged) == report_lines(single)
+    if by != "entry":
+        # Entry shards report the missing corrections of their own entries
+        assert missing_lines(sharded) == missing_lines(single)
+
+
+def test_merge_rejects_mismatched_shard_counts(lexical_evaluator, data_path, tmp_path):
+    from geceval.sharding import Shard, merge_shards
+
+    paths = [str(tmp_path / "shard_0"), str(tmp_path / "shard_1")]
+    for path, shard in zip(paths, [Shard(0, 2), Shard(1, 3)]):
+        lexical_evaluator().evaluate(data_path, score_store_path=path, shard=shard)
+    with pytest.raises(ValueError):
+        merge_shards(paths, lexical_evaluator())
+
+
+def test_language_index_subset(merged_data):
+    language_index = LanguageIndex.from_data("en", merged_data["en"])
+    subset = language_index.subset([1, 3, 4])
+    assert subset.entry_ids == ["en-1", "en-3", "en-4"]
+    assert subset.original_texts == ["I goes home.", "Yes", "a  b"]
+    assert list(subset.global_positions) == [1, 3, 4]
+    # en-1 has no (2, "phi") correction
+    phi = subset.get_slice(2, "phi")
+    assert phi.positions.tolist() == [1, 2]
+    assert phi.texts == ["Yes! ", "A  b! "]
+    assert subset.get_slice(1, "aya").has_correction.tolist() == [True] * 3
+    assert np.array_equal(language_index.get_slice(1, "phi").positions, np.arange(5))
+
+
+@pytest.mark.parametrize(
+    "options", [{"report_detection_f1": True}, {"bootstrap_samples": 10}]
+)
+def test_unmerged_reports_rejected_with_shard(
+    lexical_evaluator, data_path, tmp_path, options
+):
+    from geceval.sharding import Shard
+
+    with pytest.raises(ValueError):
+        lexical_evaluator().evaluate(
+            data_path,
+            score_store_path=str(tmp_path / "shard_0"),
+            shard=Shard(0, 2),
+            **options,
+        )
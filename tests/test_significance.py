@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from geceval.correction_index import LanguageIndex
+from geceval.significance import bootstrap_significance, score_matrix
+
+
+def naive_significance(scores, present, num_samples, confidence, seed):
+    """Loop version of bootstrap_significance drawing the same random numbers"""
+    rng = np.random.default_rng(seed)
+    num_models, num_entries = scores.shape
+    pairs = [(a, b) for a in range(num_models) for b in range(a + 1, num_models)]
+
+    def pair_mean(a, b, entries, signs=None):
+        both = [e for e in entries if present[a, e] and present[b, e]]
+        if not both:
+            return np.nan
+        differences = [scores[a, e] - scores[b, e] for e in both]
+        if signs is not None:
+            differences = [d * signs[e] for d, e in zip(differences, both)]
+        return np.mean(differences)
+
+    everything = range(num_entries)
+    means = [
+        np.mean([scores[m, e] for e in everything if present[m, e]])
+        for m in range(num_models)
+    ]
+    observed = [pair_mean(a, b, everything) for a, b in pairs]
+
+    resampled_means = [[] for _ in range(num_models)]
+    bootstrap_exceed = np.zeros(len(pairs))
+    for sample in rng.integers(0, num_entries, size=(num_samples, num_entries)):
+        for m in range(num_models):
+            kept = [scores[m, e] for e in sample if present[m, e]]
+            resampled_means[m].append(np.mean(kept) if kept else np.nan)
+        for idx, (a, b) in enumerate(pairs):
+            difference = pair_mean(a, b, sample)
+            bootstrap_exceed[idx] += abs(difference - observed[idx]) >= abs(
+                observed[idx]
+            )
+
+    permutation_exceed = np.zeros(len(pairs))
+    signs = rng.choice(np.array([-1.0, 1.0]), size=(num_samples, num_entries))
+    for sample_signs in signs:
+        for idx, (a, b) in enumerate(pairs):
+            permuted = pair_mean(a, b, everything, sample_signs)
+            permutation_exceed[idx] += abs(permuted) >= abs(observed[idx]) - 1e-12
+
+    tail = (1.0 - confidence) / 2 * 100
+    lower = [np.nanpercentile(m, tail) for m in resampled_means]
+    upper = [np.nanpercentile(m, 100 - tail) for m in resampled_means]
+    bootstrap_p = (bootstrap_exceed + 1) / (num_samples + 1)
+    permutation_p = (permutation_exceed + 1) / (num_samples + 1)
+    return means, lower, upper, pairs, observed, bootstrap_p, permutation_p
+
+
+def test_matches_naive_loop():
+    rng = np.random.default_rng(7)
+    scores = rng.random((3, 12))
+    present = (rng.random((3, 12)) > 0.2).astype(float)
+    result = bootstrap_significance(scores, present, 50, 0.9, seed=3)
+    expected = naive_significance(scores, present, 50, 0.9, seed=3)
+    for value, expected_value in zip(result, expected):
+        if isinstance(expected_value, list) and isinstance(expected_value[0], tuple):
+            assert value == expected_value
+        else:
+            assert np.asarray(value) == pytest.approx(np.asarray(expected_value))
+
+
+def test_chunked_resamples_match(monkeypatch):
+    import geceval.significance
+
+    scores = np.random.default_rng(1).random((2, 10))
+    present = np.ones((2, 10))
+    whole = bootstrap_significance(scores, present, 40, seed=5)
+    monkeypatch.setattr(geceval.significance, "CHUNK_CELLS", 30)
+    chunked = bootstrap_significance(scores, present, 40, seed=5)
+    # Chunks draw the same random numbers as one whole matrix
+    for value, expected in zip(chunked, whole):
+        assert np.asarray(value) == pytest.approx(np.asarray(expected))
+
+
+def test_identical_models_not_significant():
+    scores = np.tile(np.linspace(0, 1, 8), (2, 1))
+    present = np.ones_like(scores)
+    _, lower, upper, pairs, observed, bootstrap_p, permutation_p = (
+        bootstrap_significance(scores, present, 100)
+    )
+    assert pairs == [(0, 1)]
+    assert observed.tolist() == [0.0]
+    assert bootstrap_p.tolist() == [1.0]
+    assert permutation_p.tolist() == [1.0]
+    assert (lower <= 0.5).all() and (upper >= 0.5).all()
+
+
+def test_score_matrix_aligns_missing_corrections(merged_data):
+    language_index = LanguageIndex.from_data("en", merged_data["en"])
+    phi_positions = language_index.get_slice(2, "phi").positions
+    corrected_scores = {
+        (2, "aya"): [1.0] * 5,
+        (2, "phi"): [float(p) for p in phi_positions],
+    }
+    scores, present = score_matrix(
+        corrected_scores, language_index, 2, ["aya", "phi"]
+    )
+    assert present.tolist() == [[1, 1, 1, 1, 1], [1, 0, 1, 1, 1]]
+    assert scores[1].tolist() == [0.0, 0.0, 2.0, 3.0, 4.0]
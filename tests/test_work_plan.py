@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+from geceval.work_plan import IDENTITY, WorkPlan
+
+
+def test_single_texts_scored_once():
+    plan = WorkPlan()
+    originals = plan.add(["a", "b", "a"])
+    corrections = plan.add(["b", "c"])
+    assert plan.texts == ["a", "b", "c"]
+    assert plan.references == []
+    assert plan.num_items == 5
+    assert originals.tolist() == [0, 1, 0]
+    assert corrections.tolist() == [1, 2]
+
+    scores = plan.scatter([len(text) * 1.0 for text in plan.texts], [originals])
+    assert scores == [[1.0, 1.0, 1.0]]
+
+
+def test_pairs_deduplicated_with_identity():
+    plan = WorkPlan(identity_score=1.0)
+    first = plan.add(["x y", "x", "x", " "], ["x y", "y", "y", " "])
+    second = plan.add(["x", "y"], ["y", "x"])
+    assert len(plan) == 3
+    pairs = list(zip(plan.texts, plan.references))
+    assert pairs == [("x", "y"), (" ", " "), ("y", "x")]
+    # A blank identical pair is scored, not resolved to the identity score
+    assert first.tolist() == [IDENTITY, 0, 0, 1]
+    assert second.tolist() == [0, 2]
+
+    scores = plan.scatter([0.25, 0.5, 0.75], [first, second])
+    assert scores == [[1.0, 0.25, 0.25, 0.5], [0.25, 0.75]]
+
+
+def test_identical_pairs_scored_without_identity_score():
+    plan = WorkPlan()
+    segment = plan.add(["a", "a"], ["a", "b"])
+    assert segment.tolist() == [0, 1]
+    assert plan.scatter(np.array([0.5, 0.1]), [segment]) == [[0.5, 0.1]]
+
+
+def test_scatter_of_empty_segment():
+    plan = WorkPlan()
+    segment = plan.add([])
+    assert plan.scatter([], [segment]) == [[]]
+    assert math.isnan(plan.scatter([], [np.array([IDENTITY])])[0][0])